@@ -394,16 +394,23 @@ class MainAgent(BaseAgent):
         from aacode.utils.tool_schemas import get_all_schemas
 
         _all_schemas = get_all_schemas()
-        _openai_tools = None
-        _anthropic_tools = None
-        if _all_schemas:
-            _openai_tools = to_openai_tools(_all_schemas)
-            _anthropic_tools = to_anthropic_tools(_all_schemas)
+        # 原生 tools 按网关缓存，只转换实际用到的那一种格式
+        _native_tools: Dict[str, Optional[list]] = {}
+
+        def _get_native_tools(gateway: str) -> Optional[list]:
+            if gateway not in _native_tools:
+                if not _all_schemas:
+                    _native_tools[gateway] = None
+                elif gateway == "anthropic":
+                    _native_tools[gateway] = to_anthropic_tools(_all_schemas)
+                else:
+                    _native_tools[gateway] = to_openai_tools(_all_schemas)
+            return _native_tools[gateway]
 
         async def model_caller(messages: List[Dict]) -> Dict[str, Any]:
             """调 with 模型，返回 {"text": str, "tool_calls": list}"""
             gateway = model_config.get("gateway", "openai")
-            native_tools = _anthropic_tools if gateway == "anthropic" else _openai_tools
+            native_tools = _get_native_tools(gateway)
 
             # 重试机制：网络瞬断、协议错误、5xx等自动重试
             _max_retries = 3
@@ -1319,6 +1326,7 @@ mark_todo_completed(todo_id="t1") → precisely marked complete
         )
         if not has_user_msg:
             await self.session_manager.add_message("user", task)
+            await self.session_manager.flush()
 
         # ─── 运 linesReAct循环（增量持久化：每轮迭代立即保存消息） ──
         _task_error = None
@@ -999,7 +999,8 @@ During each thought, naturally plan:
         """executeAction（内部方法，返回完整结果）"""
         registry = get_global_registry()
 
-        if action not in self.tools:
+        tool_func = self.tools.get(action)
+        if tool_func is None:
             # 使 with 工具注册表提供友好的错误消息
             return registry.format_tool_not_found_error(action)
 
@@ -1053,10 +1054,10 @@ During each thought, naturally plan:
             hb_task = asyncio.create_task(_heartbeat(action, action_start, tool_timeout or 600))
             try:
                 coro = (
-                    self.tools[action](**action_input)
-                    if asyncio.iscoroutinefunction(self.tools[action])
+                    tool_func(**action_input)
+                    if asyncio.iscoroutinefunction(tool_func)
                     else asyncio.get_event_loop().run_in_executor(
-                        None, lambda: self.tools[action](**action_input)
+                        None, lambda: tool_func(**action_input)
                     )
                 )
                 if tool_timeout:
@@ -353,6 +353,10 @@ class AICoder:
                 # 清理web_tools资源
                 if hasattr(self.main_agent, "web_tools"):
                     await self.main_agent.web_tools.cleanup()
+                # 等待待办清单的批量写入完成
+                await self.todo_manager.flush()
+                # 落盘会话尚未保存的延迟写入（消息日志和索引）
+                await self.main_agent.session_manager.close()
             except Exception as e:
                 print(f"⚠️  Error cleaning up: {e}")
 
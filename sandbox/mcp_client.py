@@ -20,12 +20,26 @@ from aacode.i18n import t
 class MCPClient:
     """MCP客户端"""
 
+    # 连接池默认值，与 aiohttp.TCPConnector 的默认值一致；MCPServerConfig 共用这一组
+    DEFAULT_MAX_CONNECTIONS = 100  # 连接池总上限
+    DEFAULT_MAX_CONNECTIONS_PER_HOST = 0  # 单主机并发连接上限，0 表示不限
+    DEFAULT_KEEPALIVE_TIMEOUT = 15.0  # 空闲连接保持秒数
+
     def __init__(
-        self, server_url: str = "http://localhost:3000", client_name: str = "ai_coder"
+        self,
+        server_url: str = "http://localhost:3000",
+        client_name: str = "ai_coder",
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
     ):
 
         self.server_url = server_url.rstrip("/")
         self.client_name = client_name
+        # 连接池限制，避免并发 agent 打满同一个 MCP 服务器
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
         self.session_id: str | None = None
         self.tools: dict[str, dict] = {}
 
@@ -36,7 +50,12 @@ class MCPClient:
         """连接到MCP服务器"""
         # 添加超时保护，避免网络问题时卡住
         self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=10, connect=5)
+            timeout=aiohttp.ClientTimeout(total=10, connect=5),
+            connector=aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            ),
         )
 
         try:
@@ -166,16 +166,11 @@ class AICoderRunner:
 
     async def get_session_messages(self, project_path: str, session_id: str) -> list:
         """Get messages for a session"""
-        session_file = (
-            Path(project_path) / ".aacode" / "sessions" / f"{session_id}.json"
-        )
-        if not session_file.exists():
-            return []
+        from aacode.utils.session_manager import read_session_messages
 
+        sessions_dir = Path(project_path) / ".aacode" / "sessions"
         try:
-            with open(session_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("messages", [])
+            return read_session_messages(sessions_dir, session_id) or []
         except Exception:
             return []
 
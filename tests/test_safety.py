@@ -0,0 +1,157 @@
+"""安全护栏测试"""
+
+import pytest
+import sys
+import os
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _guard(tmp_path, **kwargs):
+    from utils.safety import SafetyGuard
+
+    kwargs.setdefault("interactive", False)
+    return SafetyGuard(tmp_path, **kwargs)
+
+
+def test_rm_dangerous_targets(tmp_path):
+    """测试 rm 的极度危险目标"""
+    guard = _guard(tmp_path)
+
+    for target in ["/", "/*", "~", "/etc", "/etc/hosts", "/usr/lib/x", "~/notes"]:
+        result = guard.check_command(f"rm -rf {target}")
+        assert result["allowed"] is False, target
+        assert result["risk_level"] == guard.RISK_DANGEROUS
+
+    # 项目内的删除不受影响
+    assert guard.check_command("rm -rf build")["allowed"] is True
+    assert guard.check_command("rm file.txt")["allowed"] is True
+
+    print("✅ rm 危险目标测试通过")
+
+
+def test_dangerous_commands(tmp_path):
+    """测试危险命令检测"""
+    guard = _guard(tmp_path, dangerous_command_action="reject")
+
+    for command in [
+        "dd if=/dev/zero of=x",
+        "mkfs.ext4 /dev/sda",
+        "shutdown -h now",
+        "sudo reboot",
+        "ls; chmod 777 /etc",
+        "systemctl restart nginx",
+    ]:
+        result = guard.check_command(command)
+        assert result["allowed"] is False, command
+
+    # 包装命令和 -c 内联脚本中的危险命令同样要拦截
+    for command in [
+        'bash -c "dd if=/dev/zero of=/dev/sda"',
+        "sh -c 'mkfs.ext4 /dev/sda'",
+        "nohup /sbin/shutdown -h now",
+        "timeout 5 mkfs.ext4 /dev/sda",
+        "ssh host 'reboot now'",
+    ]:
+        assert guard.check_command(command)["allowed"] is False, command
+
+    # 非危险命令、子命令名和参数中的同名单词不应误判
+    for command in [
+        "git init", "ls -la", "echo hello", "git status",
+        "cat format", "which dd", "make format",
+    ]:
+        assert guard.check_command(command)["allowed"] is True, command
+
+    # 快速路径不能绕过分隔符检查
+    for command in ["cat x; shutdown now", "ls && halt -p"]:
+        assert guard.check_command(command)["allowed"] is False, command
+
+    print("✅ 危险命令检测测试通过")
+
+
+def test_unknown_command(tmp_path):
+    """测试白名单外的命令"""
+    guard = _guard(tmp_path)
+
+    result = guard.check_command("definitely-not-a-command --flag")
+    assert result["allowed"] is False
+    assert result["risk_level"] == guard.RISK_UNKNOWN
+    assert "ls" in result["suggestion"]
+
+    print("✅ 未知命令测试通过")
+
+
+def test_is_safe_path(tmp_path):
+    """测试路径安全检查"""
+    guard = _guard(tmp_path)
+
+    assert guard.is_safe_path(tmp_path / "src" / "main.py") is True
+    assert guard.is_safe_path(tmp_path) is True
+    assert guard.is_safe_path(Path("/tmp/scratch")) is True
+
+    relaxed = _guard(tmp_path, restrict_to_project=False)
+    assert relaxed.is_safe_path(Path("/definitely/elsewhere")) is True
+
+    print("✅ 路径安全检查测试通过")
+
+
+def test_log_mode_warns_every_time(tmp_path, caplog):
+    """测试 log 模式下放行的危险命令不进入结果缓存，每次都输出警告"""
+    guard = _guard(tmp_path, dangerous_command_action="log")
+
+    for _ in range(2):
+        caplog.clear()
+        result = guard.check_command("dd if=a of=b")
+        assert result["allowed"] is True
+        assert result["risk_level"] == guard.RISK_WARNING
+        assert "Disk copy/erase" in caplog.text
+
+    print("✅ log 模式警告测试通过")
+
+
+def test_python_code_fullwidth_identifiers(tmp_path):
+    """测试全角标识符（NFKC 归一化后为危险调用）不能绕过 Python 代码检查"""
+    guard = _guard(tmp_path)
+
+    assert guard._check_python_code('import os\nos.ｓｙｓｔｅｍ("rm -rf ~")') is False
+    assert guard._check_python_code("from os import ｐｏｐｅｎ") is False
+    assert guard._check_python_code("print('hello')") is True
+
+    print("✅ 全角标识符检查测试通过")
+
+
+def test_symlink_escape_rejected(tmp_path, monkeypatch):
+    """测试经由项目内符号链接指向项目外的绝对路径会被拒绝"""
+    guard = _guard(tmp_path)
+    (tmp_path / "a.txt").write_text("x")
+    os.symlink("/usr/lib", tmp_path / "out")
+    monkeypatch.chdir(tmp_path)
+
+    for command in [f"cp a.txt {tmp_path}/out/y", f"mv a.txt {tmp_path}/out/y"]:
+        assert guard.check_command(command)["allowed"] is False, command
+    assert guard.check_command(f"cp a.txt {tmp_path}/b.txt")["allowed"] is True
+
+    print("✅ 符号链接逃逸测试通过")
+
+
+def test_verdict_cache_tracks_filesystem(tmp_path, monkeypatch):
+    """测试解析过路径的放行结果不被缓存，目录换成符号链接后重新检查"""
+    guard = _guard(tmp_path)
+    (tmp_path / "a.txt").write_text("x")
+    (tmp_path / "out").mkdir()
+    monkeypatch.chdir(tmp_path)
+
+    command = f"cp a.txt {tmp_path}/out/y"
+    assert guard.check_command(command)["allowed"] is True
+
+    (tmp_path / "out").rmdir()
+    os.symlink("/usr/lib", tmp_path / "out")
+    assert guard.check_command(command)["allowed"] is False
+
+    # 不涉及路径解析的命令仍然走缓存
+    guard.check_command("git status")
+    assert any(key[0] == "git status" for key in guard._verdict_cache)
+
+    print("✅ 结果缓存文件系统依赖测试通过")
@@ -0,0 +1,125 @@
+"""会话管理器持久化测试"""
+
+import pytest
+import sys
+import os
+import json
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _index_on_disk(manager):
+    index_file = manager.sessions_dir / "sessions_index.json"
+    return json.loads(index_file.read_text(encoding="utf-8"))
+
+
+@pytest.mark.asyncio
+async def test_switch_session_round_trip(tmp_path):
+    """测试切换会话时延迟保存的消息和索引一并落盘，重新加载后一致"""
+    from utils.session_manager import SessionManager
+
+    manager = SessionManager(tmp_path)
+    first = await manager.create_session("first task")
+    second = await manager.create_session("second task")
+
+    await manager.switch_session(first)
+    await manager.add_message("assistant", "reply 1")
+    await manager.add_message("user", "question 2")
+    # 延迟保存尚未执行时立即切换
+    await manager.switch_session(second)
+
+    assert _index_on_disk(manager)[first]["total_messages"] == 3
+
+    reloaded = SessionManager(tmp_path)
+    assert reloaded.sessions_index[first].total_messages == 3
+    messages = await reloaded.get_messages(first)
+    assert [m["content"] for m in messages] == ["first task", "reply 1", "question 2"]
+
+    await manager.close()
+    await reloaded.close()
+    print("✅ 切换会话持久化测试通过")
+
+
+@pytest.mark.asyncio
+async def test_flush_and_exit_ordering(tmp_path):
+    """测试 flush 后日志完整，以及未 flush 时退出钩子写回消息和索引"""
+    from utils.session_manager import (
+        SessionManager,
+        _flush_managers_at_exit,
+        read_session_messages,
+    )
+
+    manager = SessionManager(tmp_path)
+    session_id = await manager.create_session("task")
+    for i in range(3):
+        await manager.add_message("assistant", f"step {i}")
+    await manager.flush()
+
+    messages = read_session_messages(manager.sessions_dir, session_id)
+    assert [m["content"] for m in messages] == ["task", "step 0", "step 1", "step 2"]
+    assert _index_on_disk(manager)[session_id]["total_messages"] == 4
+
+    # 模拟事件循环结束前延迟保存来不及执行：退出钩子同步写回消息日志和索引
+    await manager.add_message("user", "pending")
+    assert manager._dirty
+    _flush_managers_at_exit()
+    assert not manager._dirty
+    assert _index_on_disk(manager)[session_id]["total_messages"] == 5
+    messages = read_session_messages(manager.sessions_dir, session_id)
+    assert messages[-1]["content"] == "pending"
+
+    # 中断写入留下半行：加载时跳过，下次保存整体重写日志
+    await manager.flush()
+    log_file = manager.sessions_dir / f"{session_id}.jsonl"
+    with open(log_file, "ab") as f:
+        f.write(b'{"role": "assistant", "cont')
+
+    reloaded = SessionManager(tmp_path)
+    await reloaded.switch_session(session_id)
+    assert len(reloaded.current_messages) == 5
+    await reloaded.add_message("assistant", "after crash")
+    await reloaded.flush()
+
+    messages = read_session_messages(reloaded.sessions_dir, session_id)
+    assert messages[-1]["content"] == "after crash"
+    assert len(messages) == 6
+    assert log_file.read_bytes().endswith(b"\n")
+
+    await manager.close()
+    await reloaded.close()
+    print("✅ 保存顺序测试通过")
+
+
+@pytest.mark.asyncio
+async def test_flush_covers_messages_added_during_write(tmp_path):
+    """测试写盘过程中新增的消息在 flush 返回前落盘"""
+    import asyncio
+    from utils.session_manager import SessionManager, read_session_messages
+
+    manager = SessionManager(tmp_path)
+    session_id = await manager.create_session("task")
+
+    write_session_file = manager._write_session_file
+    writing = asyncio.Event()
+
+    async def slow_write():
+        writing.set()
+        await asyncio.sleep(0.05)
+        await write_session_file()
+
+    manager._write_session_file = slow_write
+
+    await manager.add_message("assistant", "first")
+    flush_task = asyncio.create_task(manager.flush())
+    await writing.wait()
+    # 延迟保存正在写盘时追加消息：不会安排新的保存任务
+    await manager.add_message("user", "second")
+    await flush_task
+
+    assert not manager._dirty
+    messages = read_session_messages(manager.sessions_dir, session_id)
+    assert [m["content"] for m in messages] == ["task", "first", "second"]
+
+    await manager.close()
+    print("✅ 写盘期间新增消息测试通过")
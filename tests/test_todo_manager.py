@@ -0,0 +1,84 @@
+"""待办清单管理器测试"""
+
+import pytest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+_HEADER = [
+    "# demo - Todo List",
+    "",
+    "**Task**: demo",
+    "",
+    "## Todo",
+    "- [ ] 🟡 **Task** [#t1]: existing item",
+    "",
+    "## Completed",
+]
+
+
+async def _manager_with_file(tmp_path, content: bytes):
+    from utils.todo_manager import TodoManager
+
+    manager = TodoManager(tmp_path)
+    todo_file = manager.todo_dir / "demo_to-do-list.md"
+    todo_file.write_bytes(content)
+    manager.current_todo_file = todo_file
+    return manager, todo_file
+
+
+@pytest.mark.asyncio
+async def test_tail_rewrite_crlf(tmp_path):
+    """测试 CRLF 文件只重写尾部时不破坏未修改的行"""
+    content = "\r\n".join(_HEADER).encode("utf-8") + b"\r\n"
+    manager, todo_file = await _manager_with_file(tmp_path, content)
+
+    todo_id = await manager.add_todo_item("new item", priority="high")
+    assert todo_id == "t2"
+    assert await manager.mark_todo_completed(todo_id="t1")
+    await manager.close()
+
+    data = todo_file.read_bytes()
+    # 插入点之前的字节原样保留
+    head = "\r\n".join(_HEADER[:5]).encode("utf-8") + b"\r\n"
+    assert data.startswith(head)
+    lines = data.decode("utf-8").splitlines()
+    assert "- [ ] 🔴 **Task** [#t2]: new item" in lines
+    assert not any("- [ ] 🟡 **Task** [#t1]" in line for line in lines)
+    assert any(line.startswith("- [x]") and "existing item" in line for line in lines)
+
+    # 重新从磁盘解析，统计结果一致
+    from utils.todo_manager import TodoManager
+
+    pending, completed, _ = await TodoManager(tmp_path)._count_todos(todo_file)
+    assert (pending, completed) == (1, 1)
+
+    print("✅ CRLF 尾部重写测试通过")
+
+
+@pytest.mark.asyncio
+async def test_tail_rewrite_without_trailing_newline(tmp_path):
+    """测试没有结尾换行的文件：追加后不多出换行，也不丢失最后一行"""
+    content = "\n".join(_HEADER).encode("utf-8")
+    manager, todo_file = await _manager_with_file(tmp_path, content)
+
+    # 同一轮提交的多个修改合并写入
+    import asyncio
+
+    ids = await asyncio.gather(
+        manager.add_todo_item("first"), manager.add_todo_item("second")
+    )
+    assert sorted(ids) == ["t2", "t3"]
+    await manager.close()
+
+    text = todo_file.read_text(encoding="utf-8")
+    assert text.endswith("## Completed")
+    lines = text.split("\n")
+    assert lines[: len(_HEADER) - 4] == _HEADER[:4]
+    assert sum(1 for line in lines if line.startswith("- [ ]")) == 3
+    assert lines.count("## Completed") == 1
+
+    print("✅ 无结尾换行尾部重写测试通过")
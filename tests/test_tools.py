@@ -3,6 +3,7 @@
 import pytest
 import sys
 import os
+import json
 from pathlib import Path
 
 # 添加项目根目录到Python路径
@@ -61,6 +62,71 @@ def test_tool_registry():
     print("✅ 工具注册表测试通过")
 
 
+def test_param_alias_resolution(caplog):
+    """测试参数别名解析与冲突处理"""
+    from utils.tool_registry import ToolRegistry, ToolSchema, ToolParameter
+
+    registry = ToolRegistry()
+    schema = ToolSchema(
+        name="copy",
+        description="复制文件",
+        parameters=[
+            ToolParameter(name="src", type=str, aliases=["source", "dst"]),
+            ToolParameter(name="dst", type=str, aliases=["target", "source"]),
+        ],
+    )
+    registry.register(lambda src, dst: None, schema)
+
+    assert registry.resolve_alias("copy", "source") == "src"
+    assert registry.resolve_alias("copy", "target") == "dst"
+    # 真实参数名优先于其他参数的同名别名
+    assert registry.resolve_alias("copy", "dst") == "dst"
+    # 未知参数和未知工具原样返回
+    assert registry.resolve_alias("copy", "other") == "other"
+    assert registry.resolve_alias("missing", "source") == "source"
+    assert schema.resolve_alias("target") == "dst"
+    # 冲突的别名通过日志警告
+    assert "alias 'source' of 'dst' conflicts with 'src'" in caplog.text
+
+    assert schema.normalize_params({"source": "a", "target": "b"}) == {
+        "src": "a",
+        "dst": "b",
+    }
+
+    print("✅ 参数别名解析测试通过")
+
+
+def test_schema_examples_unique():
+    """测试内置工具schema的示例没有重复"""
+    from utils.tool_schemas import ALL_SCHEMAS
+
+    for tool_name, schema in ALL_SCHEMAS.items():
+        examples = [dict(example) for example in schema.examples]
+        for i, example in enumerate(examples):
+            assert example not in examples[:i], (tool_name, example)
+
+    print("✅ schema示例去重测试通过")
+
+
+def test_native_tools_do_not_share_cached_schema():
+    """测试转换出的原生 tools 修改后不影响 schema 上缓存的 JSON Schema"""
+    from utils.tool_adapter import to_anthropic_tools, to_openai_tools
+    from utils.tool_schemas import get_schema
+
+    schema = get_schema("run_shell")
+    expected = json.loads(json.dumps(schema.json_schema))
+
+    openai_tools = to_openai_tools({"run_shell": schema})
+    openai_tools[0]["function"]["parameters"]["properties"].clear()
+    anthropic_tools = to_anthropic_tools({"run_shell": schema})
+    anthropic_tools[0]["input_schema"]["required"].append("extra")
+
+    assert schema.json_schema == expected
+    assert to_openai_tools({"run_shell": schema})[0]["function"]["parameters"] == expected
+
+    print("✅ 原生 tools 隔离测试通过")
+
+
 def test_light_ast():
     """测试轻量AST工具"""
     from utils.light_ast import LightAST
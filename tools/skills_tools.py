@@ -225,9 +225,11 @@ class SkillsManager:
 
         main_func_name = func_names[0]
 
+        # 模块只execute一次，所有函数共用，避免每个函数都重新导入一遍skill
+        module = self._load_skill_module(main_impl)
         all_functions = {}
         for func_name in func_names:
-            params, examples = self._extract_function_info(main_impl, func_name)
+            params, examples = self._extract_function_info(module, func_name)
             all_functions[func_name] = {"parameters": params, "examples": examples}
 
         #  with  SKILL.md 的 Parameters 段落补全函数参数描述
@@ -362,16 +364,24 @@ class SkillsManager:
         except:
             return ""
 
-    def _extract_function_info(self, impl_file: Path, func_name: str) -> tuple:
-        """提取函数参数和示例"""
+    def _load_skill_module(self, impl_file: Path) -> Optional[Any]:
+        """加载skill实现模块，失败返回 None"""
         try:
             spec = importlib.util.spec_from_file_location("skill", impl_file)
             if spec is None or spec.loader is None:
-                return {}, []
+                return None
 
             module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(module)
+            return module
+        except:
+            return None
 
+    def _extract_function_info(self, module: Optional[Any], func_name: str) -> tuple:
+        """从已加载的skill模块提取函数参数和示例"""
+        if module is None:
+            return {}, []
+        try:
             func = getattr(module, func_name, None)
             if not func:
                 return {}, []
@@ -14,12 +14,29 @@ import asyncio
 import json
 import os
 import sys
+import time
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 import aiohttp
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from aacode.i18n import t
 
+_loads: Callable[[Union[str, bytes]], Any]
+
+try:
+    import orjson
+
+    def _dumps(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(data: Any) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+    _loads = json.loads
+
 if __package__ in (None, ""):
     sys.path.insert(0, str(Path(__file__).parent.parent.parent))
     from sandbox.mcp_client import MCPClient, LocalMCPClient
@@ -27,7 +44,7 @@ else:
     from ..sandbox.mcp_client import MCPClient, LocalMCPClient
 
 
-@dataclass
+@dataclass(slots=True)
 class MCPServerConfig:
     """MCP服务器配置"""
 
@@ -41,6 +58,24 @@ class MCPServerConfig:
     tools: List[str] = field(default_factory=list)
     timeout: int = 30
     retry_count: int = 3
+    max_connections: int = MCPClient.DEFAULT_MAX_CONNECTIONS  # SSE连接池总上限
+    max_connections_per_host: int = MCPClient.DEFAULT_MAX_CONNECTIONS_PER_HOST  # 单主机并发上限，0 不限
+    keepalive_expiry: float = MCPClient.DEFAULT_KEEPALIVE_TIMEOUT  # 空闲连接保持秒数
+
+
+# 服务器类型 -> 客户端构造函数
+_TRANSPORT_FACTORIES: Dict[
+    str, Callable[[MCPServerConfig], Union[MCPClient, LocalMCPClient]]
+] = {
+    "sse": lambda cfg: MCPClient(
+        server_url=cfg.url,
+        client_name=f"ai_coder_{cfg.name}",
+        max_connections=cfg.max_connections,
+        max_connections_per_host=cfg.max_connections_per_host,
+        keepalive_timeout=cfg.keepalive_expiry,
+    ),
+    "std": lambda cfg: LocalMCPClient(),
+}
 
 
 class MCPManager:
@@ -53,6 +88,12 @@ class MCPManager:
         self.servers: Dict[str, MCPServerConfig] = {}
         self.clients: Dict[str, Union[MCPClient, LocalMCPClient]] = {}
         self.connected_servers: Dict[str, bool] = {}
+        # 服务器 -> (工具数量, 检查时间)，状态查询默认走缓存
+        self._tools_count: Dict[str, Tuple[int, float]] = {}
+
+        # 延迟保存：连续的启用/禁用切换合并为一次写盘
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
 
         # 加载配置
         self.load_config()
@@ -61,8 +102,8 @@ class MCPManager:
         """加载MCP配置"""
         try:
             if self.config_file.exists():
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    config_data = json.load(f)
+                with open(self.config_file, "rb") as f:
+                    config_data = _loads(f.read())
 
                 # 解析服务器配置
                 for server_data in config_data.get("servers", []):
@@ -174,30 +215,35 @@ class MCPManager:
     def save_config(self):
         """保存MCP配置"""
         try:
-            config_data = {
-                "servers": [
-                    {
-                        "name": server.name,
-                        "type": server.type,
-                        "url": server.url,
-                        "command": server.command,
-                        "args": server.args,
-                        "env": server.env,
-                        "enabled": server.enabled,
-                        "tools": server.tools,
-                        "timeout": server.timeout,
-                        "retry_count": server.retry_count,
-                    }
-                    for server in self.servers.values()
-                ]
-            }
+            config_data = {"servers": [asdict(s) for s in self.servers.values()]}
 
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(config_data, f, indent=2, ensure_ascii=False)
+            with open(self.config_file, "wb") as f:
+                f.write(_dumps(config_data))
 
         except Exception as e:
             print(f"⚠️ Failed to save MCP config: {e}")
 
+    def _schedule_save(self, delay: float = 0.2):
+        """标记配置已修改，并安排一次延迟保存"""
+        self._dirty = True
+        if not self._save_task or self._save_task.done():
+            self._save_task = asyncio.create_task(self._debounced_save(delay))
+
+    async def _debounced_save(self, delay: float):
+        """等待一小段时间后统一写盘"""
+        await asyncio.sleep(delay)
+        if self._dirty:
+            self._dirty = False
+            self.save_config()
+
+    async def flush_config(self):
+        """等待挂起的配置保存完成"""
+        if self._save_task and not self._save_task.done():
+            await self._save_task
+        elif self._dirty:
+            self._dirty = False
+            self.save_config()
+
     async def connect_all(self) -> Dict[str, Any]:
         """连接所有启用的MCP服务器"""
         results = {}
@@ -226,36 +272,24 @@ class MCPManager:
             await self.disconnect_server(server_name)
 
         try:
-            # 创建客户端
-            client: MCPClient | LocalMCPClient
-            if server_config.type == "sse":
-                # 检查URL是否有效
-                if not server_config.url:
-                    return {
-                        "success": False,
-                        "error": f"SSE server '{server_name}' missing URL config",
-                    }
-                client = MCPClient(
-                    server_url=server_config.url, client_name=f"ai_coder_{server_name}"
-                )
-            elif server_config.type == "std":
-                client = LocalMCPClient()
-            else:
+            # 检查URL是否有效
+            if server_config.type == "sse" and not server_config.url:
+                return {
+                    "success": False,
+                    "error": f"SSE server '{server_name}' missing URL config",
+                }
+
+            # 按类型创建客户端
+            factory = _TRANSPORT_FACTORIES.get(server_config.type)
+            if factory is None:
                 return {
                     "success": False,
                     "error": f"Unsupported MCP server type: {server_config.type}",
                 }
+            client = factory(server_config)
 
             # 连接服务器
-            if server_config.type == "std":
-                # 对于STD类型，可能需要启动子进程
-                if server_config.command:
-                    # 这里可以扩展为启动子进程
-                    pass
-
-                connected = await client.connect()
-            else:
-                connected = await client.connect()
+            connected = await client.connect()
 
             if connected:
                 self.clients[server_name] = client
@@ -263,6 +297,10 @@ class MCPManager:
 
                 # 获取工具列表
                 tools_result = await client.list_tools()
+                self._tools_count[server_name] = (
+                    tools_result.get("count", 0),
+                    time.monotonic(),
+                )
 
                 return {
                     "success": True,
@@ -280,25 +318,47 @@ class MCPManager:
     async def disconnect_server(self, server_name: str):
         """断开MCP服务器连接"""
         if server_name in self.clients:
+            server_config = self.servers.get(server_name)
+            timeout = server_config.timeout if server_config else 30
             try:
-                await self.clients[server_name].disconnect()
-                del self.clients[server_name]
-                self.connected_servers[server_name] = False
+                # shield + 超时：对端挂起时也不会阻塞清理
+                await asyncio.wait_for(
+                    asyncio.shield(self.clients[server_name].disconnect()),
+                    timeout=timeout,
+                )
             except Exception as e:
                 print(f"⚠️ Failed to disconnect MCP server: {e}")
+            finally:
+                self.clients.pop(server_name, None)
+                self._tools_count.pop(server_name, None)
+                self.connected_servers[server_name] = False
 
     async def disconnect_all(self):
         """断开所有MCP服务器连接"""
-        for server_name in list(self.clients.keys()):
-            await self.disconnect_server(server_name)
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    *[self.disconnect_server(n) for n in list(self.clients)],
+                    return_exceptions=True,
+                ),
+                timeout=10,
+            )
+        except asyncio.TimeoutError:
+            print("⚠️ Timed out disconnecting MCP servers")
 
     async def list_available_tools(self) -> Dict[str, Any]:
         """列出所有可用的MCP工具"""
         all_tools = {}
 
-        for server_name, client in self.clients.items():
+        names = list(self.clients)
+        results = await asyncio.gather(
+            *[self.clients[n].list_tools() for n in names], return_exceptions=True
+        )
+
+        for server_name, tools_result in zip(names, results):
             try:
-                tools_result = await client.list_tools()
+                if isinstance(tools_result, BaseException):
+                    raise tools_result
                 if tools_result.get("success"):
                     server_tools = tools_result.get("tools", {})
                     for tool_name, tool_info in server_tools.items():
@@ -352,10 +412,28 @@ class MCPManager:
         except Exception as e:
             return {"success": False, "error": f"Failed to call MCP tool: {str(e)}"}
 
-    async def get_server_status(self) -> Dict[str, Any]:
-        """获取所有服务器状态"""
+    async def get_server_status(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """获取所有服务器状态
+
+        Args:
+            force_refresh: 为 True 时重新向每个已连接服务器查询工具列表，
+                否则使用连接时缓存的工具数量
+        """
         status = {}
 
+        # 只对已连接且没有缓存（或强制刷新）的服务器发起 RPC
+        names = [
+            n
+            for n in self.servers
+            if n in self.clients
+            and self.connected_servers.get(n, False)
+            and (force_refresh or n not in self._tools_count)
+        ]
+        results = await asyncio.gather(
+            *[self.clients[n].list_tools() for n in names], return_exceptions=True
+        )
+        tools_results = dict(zip(names, results))
+
         for server_name, server_config in self.servers.items():
             status[server_name] = {
                 "name": server_name,
@@ -366,13 +444,23 @@ class MCPManager:
                 "command": server_config.command,
             }
 
-            if server_name in self.clients:
+            if server_name in tools_results:
                 try:
-                    tools_result = await self.clients[server_name].list_tools()
-                    status[server_name]["tools_count"] = tools_result.get("count", 0)
-                    status[server_name]["last_check"] = asyncio.get_event_loop().time()
+                    tools_result = tools_results[server_name]
+                    if isinstance(tools_result, BaseException):
+                        raise tools_result
+                    self._tools_count[server_name] = (
+                        tools_result.get("count", 0),
+                        time.monotonic(),
+                    )
                 except Exception as e:
                     status[server_name]["error"] = str(e)
+                    continue
+
+            if server_name in self.clients and server_name in self._tools_count:
+                tools_count, last_check = self._tools_count[server_name]
+                status[server_name]["tools_count"] = tools_count
+                status[server_name]["last_check"] = last_check
 
         return {
             "success": True,
@@ -422,7 +510,7 @@ class MCPManager:
             return {"success": False, "error": f"Server not found: {server_name}"}
 
         self.servers[server_name].enabled = True
-        self.save_config()
+        self._schedule_save()
 
         return await self.connect_server(server_name)
 
@@ -437,18 +525,18 @@ class MCPManager:
 
         # 更新配置
         self.servers[server_name].enabled = False
-        self.save_config()
+        self._schedule_save()
 
         return {"success": True,                     "message": f"MCP server disabled: {server_name}"}
 
     async def auto_discover_servers(self) -> Dict[str, Any]:
         """自动发现本地MCP服务器"""
-        discovered = []
+        discovered: List[MCPServerConfig] = []
 
         # 检查常见的本地端口
         common_ports = [3000, 3001, 3002, 3003, 8080, 8081, 8082]
 
-        for port in common_ports:
+        async def probe(port: int) -> Optional[MCPServerConfig]:
             try:
                 async with aiohttp.ClientSession(
                     timeout=aiohttp.ClientTimeout(total=5)
@@ -456,21 +544,41 @@ class MCPManager:
                     async with session.get(
                         f"http://localhost:{port}/health"
                     ) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            server_name = data.get("name", f"localhost_{port}")
-
-                            if server_name not in self.servers:
-                                server_config = MCPServerConfig(
-                                    name=server_name,
-                                    type="sse",
-                                    url=f"http://localhost:{port}",
-                                    enabled=False,
-                                )
-                                discovered.append(server_config)
-
+                        if response.status != 200:
+                            return None
+                        data = await response.json()
+                # /health 返回的 JSON 不是对象（或名称不是字符串）时跳过该端口
+                if not isinstance(data, dict):
+                    return None
+                server_name = data.get("name", f"localhost_{port}")
+                if not isinstance(server_name, str):
+                    return None
             except Exception:
-                continue
+                return None
+
+            if server_name in self.servers:
+                return None
+            return MCPServerConfig(
+                name=server_name,
+                type="sse",
+                url=f"http://localhost:{port}",
+                enabled=False,
+            )
+
+        # 并发探测，发现窗口结束后不再等待慢端口
+        tasks = [asyncio.create_task(probe(port)) for port in common_ports]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=2.0):
+                server_config = await next_done
+                if server_config and all(
+                    d.name != server_config.name for d in discovered
+                ):
+                    discovered.append(server_config)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
 
         # 添加发现的配置
         for server_config in discovered:
@@ -483,4 +591,5 @@ class MCPManager:
 
     async def cleanup(self):
         """清理资源"""
+        await self.flush_config()
         await self.disconnect_all()
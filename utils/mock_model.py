@@ -10,14 +10,26 @@
 import asyncio
 import json
 import random
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Tuple
 from aacode.i18n import t
 
+try:
+    import openai
+except ImportError:
+    openai = None  # type: ignore[assignment]
+
+# 按 (api_key, base_url) 缓存的持久客户端，避免每次调用都重建连接池
+_client_cache: Dict[Tuple[Any, Any], Any] = {}
+
 
 class MockModel:
     """模拟模型类"""
 
     def __init__(self):
+        # 预编译路由关键词，避免每次调用都对整段消息做 lower()
+        self._create_re = re.compile(r"创建|create", re.IGNORECASE)
+        self._run_re = re.compile(r"运行|run", re.IGNORECASE)
         self.responses = {
             "default": [
                 '我需要分析这个任务并制定计划。\n\nAction: run_shell\nAction Input: {"command": "ls"}',
@@ -44,16 +56,15 @@ class MockModel:
         """模拟聊天完成"""
 
         # 获取最后一条用户消息
-        last_message = ""
-        for msg in reversed(messages):
-            if msg.get("role") == "user":
-                last_message = msg.get("content", "")
-                break
+        last_message = next(
+            (m.get("content", "") for m in reversed(messages) if m.get("role") == "user"),
+            "",
+        )
 
         # 根据消息内容选择响应
-        if "create" in last_message.lower():
+        if self._create_re.search(last_message):
             response_text = random.choice(self.responses["create_file"])
-        elif "run" in last_message.lower():
+        elif self._run_re.search(last_message):
             response_text = random.choice(self.responses["run_file"])
         else:
             response_text = random.choice(self.responses["default"])
@@ -81,14 +92,23 @@ async def create_mock_model_caller(model_config: Dict):
     async def model_caller(messages: List[Dict]) -> str:
         try:
             # 如果有真实的API配置，尝试使用
-            if model_config.get("api_key") and model_config.get("base_url"):
+            if (
+                openai is not None
+                and model_config.get("api_key")
+                and model_config.get("base_url")
+            ):
                 try:
-                    import openai
-
-                    client = openai.AsyncOpenAI(
-                        api_key=model_config.get("api_key"),
-                        base_url=model_config.get("base_url"),
-                    )
+                    key = (model_config.get("api_key"), model_config.get("base_url"))
+                    client = _client_cache.get(key)
+                    if client is None:
+                        client = _client_cache.setdefault(
+                            key,
+                            openai.AsyncOpenAI(
+                                api_key=key[0],
+                                base_url=key[1],
+                                max_retries=2,
+                            ),
+                        )
 
                     response = await client.chat.completions.create(
                         model=model_config.get("name", "gpt-4"),
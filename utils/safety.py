@@ -10,70 +10,137 @@
 
 from __future__ import annotations
 
+import logging
+import os
 import re
 import shlex
+import sys
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple, Set, Any, Union
+from typing import Dict, List, Optional, Tuple, Set, Any, Union
 import ast
 from aacode.i18n import t
 
-
-class SafetyGuard:
-    """安全护栏"""
-
-    # 风险等级
-    RISK_SAFE = "safe"  # 安全命令，直接允许
-    RISK_WARNING = "warning"  # 警告命令，需要确认
-    RISK_DANGEROUS = "dangerous"  # 危险命令，直接拒绝
-    RISK_UNKNOWN = "unknown"  # 未知命令，拒绝
-
-    def __init__(
-        self,
-        project_path: Path,
-        interactive: bool = True,
-        dangerous_command_action: str = "log",
-        restrict_to_project: bool = True,
-    ):
-        self.project_path = project_path
-        self.project_root = str(project_path)
-        self.interactive = interactive  # 是否启用交互式确认
-        self.dangerous_command_action = dangerous_command_action  # reject, ask, log
-        self.restrict_to_project = restrict_to_project
-
-        # 危险命令模式（注意：rm -rf 已移到特殊检查中，允许在项目目录内使用）
-        self.dangerous_patterns = [
-            # 文件系统危险操作
-            # (r'rm\s+(-rf|-r|-f)\s+', '递归删除文件'),  # 移除，改为特殊检查
-            (r"format\s+", "Disk formatting"),
-            (r"\bdd\s+", "Disk copy/erase"),
-            (r"\bmkfs", "Create filesystem"),
-            # 系统危险操作
-            (r"shutdown\s+", "Shutdown system"),
-            (r"halt\s+", "Halt system"),
-            (r"reboot\s+", "Reboot system"),
-            (r"poweroff\s+", "Power off"),
-            (r"^\s*init\s+", "init process"),  # 只匹配开头的init命令
-            # 网络危险操作
-            (r"iptables\s+", "Firewall rules"),
-            (r"ufw\s+", "Firewall"),
-            # Shell危险操作
-            (r":\(\)\{.*?;\s*\}.*?;", "Fork bomb"),
-            (r"exec\s+/dev/", "Device execution"),
-            (
-                r"systemctl\s+(stop|restart|start|disable|enable|mask|unmask)",
-                "System service management",
-            ),
-            (
-                r"service\s+\S+\s+(stop|restart|start)",
-                "Service management",
-            ),  # service危险操作需要用户确认
-            # 特别危险的权限操作（放宽chmod和chown，但限制特定模式）
-            (r"chmod\s+[0-7]{3,4}\s+/\S*", "System directory permission change"),
-            (r"chown\s+.*?:\s+/\S*", "System file ownership change"),
-        ]
-
-        # 允许的命令白名单（相对安全）
-        self.allowed_commands = {
+_log = logging.getLogger(__name__)
+
+
+# 项目目录外允许访问的系统目录（只读或临时操作）
+_ALLOWED_SYSTEM_PREFIXES = (
+    "/dev",  # 虚拟设备（/dev/null, /dev/zero, /dev/random 等）
+    "/tmp",
+    "/var/tmp",
+    "/private/tmp",  # 临时目录（包括macOS的/private/tmp）
+    "/usr/share",
+    "/usr/local/share",  # 共享数据
+    "/usr/local",
+    "/usr/bin",
+    "/bin",
+    "/opt",
+    "/etc",  # 系统配置（/etc/hosts, /etc/resolv.conf, /etc/os-release 等）
+    "/proc",  # 系统信息（/proc/version, /proc/loadavg, /proc/uptime 等）
+    "/sys",  # 内核/设备信息
+    "/run",  # 运行时数据
+    "/var/log",  # 系统日志
+    "/Volumes",  # macOS 挂载卷
+    "/Applications",  # macOS 应用
+    "/Library",  # macOS 库
+)
+# 临时目录前缀
+_TMP_PREFIXES = ("/tmp", "/var/tmp", "/private/tmp")
+
+# 需要 shlex 处理的字符：引号、转义符，以及 str.split 视为空白而 shlex 不视为空白的控制字符
+_SHELL_META = frozenset("\"'\\\x0b\x0c\x1c\x1d\x1e\x1f")
+
+# 纯输出、低风险的命令：不含 shell 元字符时可直接放行
+_TRIVIALLY_SAFE = frozenset(
+    {
+        "ls", "pwd", "echo", "cat", "head", "tail", "wc", "which", "whereis",
+        "stat", "file", "basename", "dirname", "date", "cal", "uptime", "uname",
+    }
+)
+# 出现任一字符即不走快速路径（管道、分隔、重定向、展开、引号、续行等）
+_FAST_PATH_UNSAFE = frozenset(";|&<>$`()\\\n'\"{}!#=")
+
+# rm 极度危险的删除目标：目标本身或其下的任意路径
+_RM_DANGEROUS_TARGETS = frozenset(
+    {"/", "/*", "~", "~/*", "/etc", "/var", "/usr", "/bin", "/sbin", "/lib"}
+)
+_RM_DANGEROUS_PREFIXES = tuple(p + "/" for p in _RM_DANGEROUS_TARGETS)
+
+
+def _is_under(path: str, root: str) -> bool:
+    """判断已解析的路径字符串是否位于 root 之内（含 root 本身）"""
+    path = os.path.normcase(path)
+    root = os.path.normcase(root)
+    if path == root:
+        return True
+    return path.startswith(root if root.endswith(os.sep) else root + os.sep)
+
+
+# 危险命令模式（注意：rm -rf 已移到特殊检查中，允许在项目目录内使用）
+# 对整条命令做正则扫描，因此 bash -c "..."、nohup/timeout/xargs 等包装中的命令同样能被发现
+_DANGEROUS_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    # 文件系统危险操作
+    (r"format\s+", "Disk formatting"),
+    (r"\bdd\s+", "Disk copy/erase"),
+    (r"\bmkfs", "Create filesystem"),
+    # 系统危险操作
+    (r"shutdown\s+", "Shutdown system"),
+    (r"halt\s+", "Halt system"),
+    (r"reboot\s+", "Reboot system"),
+    (r"poweroff\s+", "Power off"),
+    (r"^\s*init\s+", "init process"),  # 只匹配开头的init命令
+    # 网络危险操作
+    (r"iptables\s+", "Firewall rules"),
+    (r"ufw\s+", "Firewall"),
+    # Shell危险操作
+    (r":\(\)\{.*?;\s*\}.*?;", "Fork bomb"),
+    (r"exec\s+/dev/", "Device execution"),
+    (
+        r"systemctl\s+(stop|restart|start|disable|enable|mask|unmask)",
+        "System service management",
+    ),
+    (
+        r"service\s+\S+\s+(stop|restart|start)",
+        "Service management",
+    ),  # service危险操作需要用户确认
+    # 特别危险的权限操作（放宽chmod和chown，但限制特定模式）
+    (r"chmod\s+[0-7]{3,4}\s+/\S*", "System directory permission change"),
+    (r"chown\s+.*?:\s+/\S*", "System file ownership change"),
+)
+
+# 模块加载时编译一次：联合正则负责快速判定是否命中，
+# 命中后再按列表顺序确定具体模式，保持原有的优先级
+_DANGEROUS_UNION_RE = re.compile(
+    "|".join(f"(?:{p})" for p, _ in _DANGEROUS_PATTERNS), re.IGNORECASE
+)
+# 每个模式必然包含的小写字面量：命令中不含任何一个时跳过正则扫描。
+# 模式可在命令任意位置命中，因此不能只看首字符
+_DANGEROUS_LITERALS = (
+    "format", "dd", "mkfs", "shutdown", "halt", "reboot", "poweroff", "init",
+    "iptables", "ufw", ":()", "exec", "systemctl", "service", "chmod", "chown",
+)
+_DANGEROUS_COMPILED = tuple(
+    (re.compile(p, re.IGNORECASE), p, desc) for p, desc in _DANGEROUS_PATTERNS
+)
+
+# 与文件路径合并的重定向操作符（2>/dev/null、&>log 等，只需跳过 1 个 token）
+_REDIR_MERGED_RE = re.compile(r'^[0-9]*[<>]|&[<>]|<>|<&|>&|>\||<<-')
+
+# 孤立的 UTF-16 代理项：str 中唯一无法编码为 UTF-8 的字符
+_SURROGATE_RE = re.compile(r"[\ud800-\udfff]")
+
+# 待执行 Python 代码中的资源消耗模式（多进程/多线程），合并为一个正则
+_PYTHON_RESOURCE_RE = re.compile(
+    r"import\s+multiprocessing|import\s+threading|\.start\(\)|\.join\(\)|Pool\(|Process\("
+)
+
+# 允许的命令白名单（相对安全）
+_ALLOWED_COMMANDS = frozenset(
+    map(
+        sys.intern,
+        {
             # ── 基础文件/目录操作（Unix/macOS） ──
             "ls",
             "cd",
@@ -144,11 +211,8 @@ class SafetyGuard:
             "rename",
             "md",
             "rd",
-            "rmdir",
             "where",
             "findstr",
-            "more",
-            "sort",
             "attrib",
             "icacls",
             "whoami",
@@ -236,7 +300,6 @@ class SafetyGuard:
             "compact",
             "forfiles",
             "tree",
-            "fc",
             "comp",
             "certutil",
             "schtasks",
@@ -301,7 +364,6 @@ class SafetyGuard:
             "gpresult",  # 组策略结果
             "takeown",  # 获取所有权
             "runas",  # 以其他用户身份运行
-            "icacls",  # 权限控制
             "msiexec",  # Windows Installer
             "winget",  # Windows 包管理器
             "wsl",  # Windows Subsystem for Linux
@@ -526,7 +588,6 @@ class SafetyGuard:
             "c++",
             "ld",
             "ar",
-            "nm",
             "objdump",
             "strip",
             "meson",
@@ -548,7 +609,6 @@ class SafetyGuard:
             "helix",
             "hx",
             # ── Shell ──
-            "bash",
             "sh",
             "zsh",
             "fish",
@@ -662,7 +722,6 @@ class SafetyGuard:
             "unexpand",
             "nl",
             "fmt",
-            "comm",
             "colrm",
             "strings",
             "od",
@@ -680,7 +739,6 @@ class SafetyGuard:
             "cksum",
             "sum",
             # ── 文件操作扩展 ──
-            "tree",
             "exa",
             "eza",
             "bat",
@@ -690,7 +748,6 @@ class SafetyGuard:
             "entr",
             "inotifywait",
             "watchexec",
-            "rsync",
             "install",
             "lsd",
             # ── 虚拟化和容器 ──
@@ -764,7 +821,6 @@ class SafetyGuard:
             "gulp",
             "grunt",
             "sass",
-            "less",
             "postcss",
             "tailwindcss",
             "turbo",
@@ -793,7 +849,6 @@ class SafetyGuard:
             "ncal",
             "bc",
             "dc",
-            "calc",
             "expr",
             "seq",
             "yes",
@@ -860,10 +915,272 @@ class SafetyGuard:
             "dmesg",
             "multitail",
             "lnav",
+        },
+    )
+)
+# 拒绝未知命令时的提示文本，只排序拼接一次
+_ALLOWED_SUGGESTION = ", ".join(sorted(_ALLOWED_COMMANDS))
+
+# _extract_command_name 使用的正则，导入时编译一次
+# 基础命令前缀（javac 需排在 java 之前）
+_CMD_BASENAME_RE = re.compile(
+    r"(python|pip|node|npm|npx|yarn|ruby|gem|bundle|javac|java|go|cargo|rustc"
+    r"|php|composer|pytest|unittest)"
+)
+# Windows 命令变体：echo. echo: echo;
+_WIN_CMD_VARIANT_RE = re.compile(r"^([a-zA-Z]+)[.:;]")
+# 版本/工具链后缀：gcc-12, openssl@3
+_VERSION_SUFFIX_RE = re.compile(r"^(.+?)[\-@]v?\d+(\.\d+)*$")
+
+
+class _UnsafeCode(Exception):
+    """_DangerousCodeFinder 发现危险导入/调用时抛出，用于提前结束遍历"""
+
+
+class _DangerousCodeFinder(ast.NodeVisitor):
+    """查找危险导入（import os.system / from os import system）和危险调用（os.system(...)）"""
+
+    def __init__(self, dangerous: frozenset):
+        self.dangerous = dangerous
+
+    def visit_Import(self, node: ast.Import):
+        for name in node.names:
+            if name.name in self.dangerous:
+                raise _UnsafeCode(name.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        module = node.module
+        for name in node.names:
+            full_name = module + "." + name.name if module else name.name
+            if full_name in self.dangerous:
+                raise _UnsafeCode(full_name)
+
+    def visit_Call(self, node: ast.Call):
+        func = node.func
+        if type(func) is ast.Attribute and type(func.value) is ast.Name:
+            func_name = func.value.id + "." + func.attr
+            if func_name in self.dangerous:
+                raise _UnsafeCode(func_name)
+        self.generic_visit(node)
+
+
+@lru_cache(maxsize=1024)
+def _extract_command_name(cmd_path: str) -> str:
+    """
+    从命令路径中提取命令名称
+
+    处理以下情况：
+    - python3 -> python
+    - ./script.sh -> script.sh
+    - .venv/bin/python -> python
+    - /usr/bin/python3 -> python
+    - pip3 -> pip
+
+    Args:
+        cmd_path: 命令路径
+
+    Returns:
+        命令名称
+    """
+    # 获取路径的最后一部分（文件名）
+    cmd_name = Path(cmd_path).name
+
+    # Windows 命令变体：echo. echo: echo; 等（Windows 下 echo. 打印空行）
+    # 提取 . : ; 之前的部分作为命令名
+    base_match = _WIN_CMD_VARIANT_RE.match(cmd_name)
+    if base_match:
+        cmd_name = base_match.group(1)
+
+    # 解释器/工具链变体按前缀归并到基础命令：python3 -> python, pip3 -> pip
+    base_match = _CMD_BASENAME_RE.match(cmd_name)
+    if base_match:
+        return sys.intern(base_match.group(1))
+
+    # 去除进程替换 (<(...) 或 >(...)) 中 shlex 合并到 token 尾部的 )
+    # 去除子 shell 分组 (...) 中 shlex 合并到 token 头部的 (
+    # 只剥离多余的括号，保留单独的 (、)、((、)) 等 shell 关键字
+    if cmd_name.startswith('(') and len(cmd_name) > 1:
+        cmd_name = cmd_name[1:]
+    if cmd_name.endswith(')') and len(cmd_name) > 1:
+        cmd_name = cmd_name[:-1]
+
+    # 去除版本/工具链后缀: gcc-12 → gcc, openssl@3 → openssl, docker-compose-v1 → docker-compose
+    _ver_match = _VERSION_SUFFIX_RE.match(cmd_name)
+    if _ver_match:
+        cmd_name = _ver_match.group(1)
+
+    # 驻留返回的命令名，白名单/风险表查找时多为指针比较
+    return sys.intern(cmd_name.lower())
+
+
+class SafetyGuard:
+    """安全护栏"""
+
+    # 风险等级
+    RISK_SAFE = "safe"  # 安全命令，直接允许
+    RISK_WARNING = "warning"  # 警告命令，需要确认
+    RISK_DANGEROUS = "dangerous"  # 危险命令，直接拒绝
+    RISK_UNKNOWN = "unknown"  # 未知命令，拒绝
+
+    # Shell 控制流关键字：纯语法结构，无直接文件操作
+    _SHELL_KEYWORDS = frozenset(
+        {
+            "for", "if", "while", "until", "case", "select", "function",
+            "[", "[[", "(", ")", "((", "))", "<<<", "{", "}", "declare", "typeset", "local", "let", "readonly",
+            "done", "esac", "fi", "then", "else", "elif", "do", "in",
+            ":", "true", "false",
         }
+    )
+
+    # check_command 结果缓存的最大条目数
+    _VERDICT_CACHE_SIZE = 256
+
+    # 高风险命令（需要特别检查）
+    _HIGH_RISK: Dict[str, str] = {
+        sys.intern(k): v
+        for k, v in {
+            "rm": "File deletion",
+            "sudo": "Privilege escalation",
+            "chmod": "Permission change",
+            "chown": "Ownership change",
+            "dd": "Disk operation",
+            "format": "Disk format",
+            "mkfs": "Create filesystem",
+            "shutdown": "System shutdown",
+            "halt": "System halt",
+            "reboot": "System reboot",
+            "pkill": "Process termination",
+            "kill": "Process termination",
+            "iptables": "Firewall config",
+            "ufw": "Firewall management",
+        }.items()
+    }
+
+    # 中风险命令（可能需要确认）
+    _MEDIUM_RISK: Dict[str, str] = {
+        sys.intern(k): v
+        for k, v in {
+            "pip": "Python package manager",
+            "pip3": "Python package manager",
+            "npm": "Node.js package manager",
+            "yarn": "Node.js package manager",
+            "apt": "System package manager",
+            "apt-get": "System package manager",
+            "docker": "Container operations",
+            "docker-compose": "Container orchestration",
+            "systemctl": "System service management",
+            "service": "Service management",
+        }.items()
+    }
+
+    # 只读命令：允许访问项目外的系统文件
+    _READONLY_CMDS = frozenset({"sysctl", "journalctl"})
+
+    # 纯输出命令：只写 stdout/stderr，不可能写文件，完全跳过路径检查
+    _OUTPUT_ONLY_CMDS = frozenset(
+        {
+            "echo", "printf", "true", "false", "yes", "seq", "expr", "bc", "dc",
+            "basename", "dirname", "realpath", "readlink", "pwd",
+            "cat", "wc", "sort", "uniq", "cut", "tr", "fold", "rev", "nl", "fmt",
+            "grep", "rg", "ag", "find", "sed", "awk",
+            "strings", "od", "hexdump", "xxd", "jq", "yq", "diff",
+            "cksum", "sum", "md5sum", "sha256sum", "shasum", "base64", "iconv",
+            "uname", "arch", "hostname", "uptime", "dmesg",
+            "lscpu", "lsblk", "lsusb", "lspci", "getconf", "locale",
+            "id", "who", "w", "last", "groups",
+            "ls", "file", "stat", "du", "df", "ps", "top", "htop",
+            "head", "tail", "less", "more",
+            "which", "whereis", "date", "cal", "locate", "mlocate",
+            "man", "info", "tldr", "apropos", "whatis",
+            "logger", "tput", "stty",
+            # 解释器：脚本路径检查无实际安全意义，脚本本身可任意操作
+            "python", "python3", "node", "ruby", "java",
+            # 目录导航：仅改变 shell 状态，不读写文件
+            "cd", "pushd", "popd", "dirs",
+        }
+    )
+
+    # 参数可能是正则表达式而非路径的命令
+    _REGEX_CMDS = frozenset({"awk", "sed", "grep", "rg", "ag", "find"})
+
+    # 允许在临时目录中操作的文件系统命令
+    _FS_MUTATORS = frozenset({"mkdir", "touch", "rm", "cp", "mv"})
+
+    # 包管理器：允许访问系统路径
+    _PACKAGE_MANAGERS = frozenset(
+        {
+            "apt", "apt-get", "dpkg",
+            "yum", "dnf",
+            "brew",
+            "pip", "pip3", "pipx",
+            "npm", "yarn", "pnpm",
+            "cargo", "go", "gem", "bundle",
+            "dotnet",
+            "conda", "mamba",
+            "pacman", "zypper",
+            "flatpak", "snap", "apk",
+            "pkg", "port",
+            "cpan", "luarocks", "composer",
+        }
+    )
+
+    # 独立的重定向操作符（需跳过操作符 + 目标共 2 个 token）
+    _REDIR_STANDALONE = frozenset({"<", ">", ">>", "<<", "<<<", ">|"})
+
+    # 项目内允许直接执行的脚本扩展名
+    _SCRIPT_EXTENSIONS = (".sh", ".py", ".js", ".rb", ".pl")
+
+    # 允许通过 sudo 执行的命令
+    _ALLOWED_SUDO_COMMANDS = frozenset(
+        {
+            "apt",
+            "apt-get",
+            "dpkg",
+            "systemctl",
+            "service",
+            "pip",
+            "pip3",
+            "npm",
+            "yarn",
+        }
+    )
+
+    # pip 禁止的操作（可能下载大量文件）
+    _FORBIDDEN_PIP_ACTIONS = frozenset({"download", "wheel"})
+
+    def __init__(
+        self,
+        project_path: Path,
+        interactive: bool = True,
+        dangerous_command_action: str = "log",
+        restrict_to_project: bool = True,
+    ):
+        self.project_path = project_path
+        self.project_root = str(project_path)
+        # 解析一次项目根目录，避免每次检查都 realpath()
+        self._project_root_resolved = Path(self.project_root).resolve()
+        self._project_root_str = str(self._project_root_resolved)
+        self._project_exec_cache: Set[str] = set()
+        self._user_home_str = str(Path.home())
+        # 允许 .. 访问的最高目录：项目目录的3级父目录
+        self._max_parent_str = str(self._project_root_resolved.parent.parent.parent)
+        self._verdict_cache: "OrderedDict[Tuple[str, bool, bool, str], Dict[str, Any]]" = (
+            OrderedDict()
+        )
+        # 本次检查是否依赖了文件系统状态（解析路径/符号链接、项目内可执行文件），
+        # 这样的结果在文件系统变化后可能失效，不进入结果缓存
+        self._fs_dependent = False
+        self.interactive = interactive  # 是否启用交互式确认
+        self.dangerous_command_action = dangerous_command_action  # reject, ask, log
+        self.restrict_to_project = restrict_to_project
+
+        self.dangerous_patterns = _DANGEROUS_PATTERNS
+
+        # 允许的命令白名单（相对安全）
+        self.allowed_commands = _ALLOWED_COMMANDS
 
         # Python危险导入（只包含真正危险的）
-        self.dangerous_imports = {
+        self.dangerous_imports = frozenset({
             "os.system",
             "os.popen",
             "subprocess.run",
@@ -874,94 +1191,53 @@ class SafetyGuard:
             # "http.server",  # 常见HTTP模块
             # "ctypes",  # 常见C接口模块
             # "cffi",  # 常见C接口模块
-        }
+        })
+        self._dangerous_leaves = tuple(
+            {name.rpartition(".")[2] for name in self.dangerous_imports}
+        )
 
     def is_safe_path(self, path: Path) -> bool:
         """检查路径是否安全（放宽限制，允许合理操作）"""
         if not self.restrict_to_project:
             return True
-        try:
-            # 获取路径字符串
-            path_str = str(path)
+        # 获取路径字符串
+        path_str = str(path)
 
-            # 解析路径
-            resolved = path.resolve()
-            project_root = Path(self.project_root).resolve()
+        # 解析路径（损坏的符号链接等可能解析失败）
+        try:
+            resolved_str = str(path.resolve())
+        except Exception:
+            # 路径解析失败，保守起见拒绝
+            return False
 
-            # 1. 检查是否在项目目录内（主要安全边界）
-            try:
-                resolved.relative_to(project_root)
-                # 在项目目录内，允许
-                return True
-            except ValueError:
-                # 不在项目目录内，进行更细致的检查
-                pass
+        # 1. 检查是否在项目目录内（主要安全边界）
+        if _is_under(resolved_str, self._project_root_str):
+            # 在项目目录内，允许
+            return True
 
-            # 2. 检查路径遍历深度（允许合理的父目录访问）
-            if ".." in path_str:
-                parts = Path(path_str).parts
-                # 计算路径遍历深度
-                dotdot_count = parts.count("..")
-
-                # 允许最多3级父目录访问
-                if dotdot_count <= 3:
-                    # 计算实际路径
-                    try:
-                        actual_path = resolved
-                        # 检查是否仍然在合理范围内（项目目录的3级父目录内）
-                        max_parent = project_root.parent.parent.parent
-                        try:
-                            actual_path.relative_to(max_parent)
-                            # 在允许的父目录范围内
-                            return True
-                        except ValueError:
-                            # 超出允许范围
-                            pass
-                    except Exception:
-                        pass
-
-            # 3. 允许特定的系统目录访问（只读或临时操作）
-            allowed_system_paths = [
-                "/dev",  # 虚拟设备（/dev/null, /dev/zero, /dev/random 等）
-                "/tmp",
-                "/var/tmp",
-                "/private/tmp",  # 临时目录（包括macOS的/private/tmp）
-                "/usr/share",
-                "/usr/local/share",  # 共享数据
-                "/usr/local",
-                "/usr/bin",
-                "/bin",
-                "/opt",
-                "/etc",  # 系统配置（/etc/hosts, /etc/resolv.conf, /etc/os-release 等）
-                "/proc",  # 系统信息（/proc/version, /proc/loadavg, /proc/uptime 等）
-                "/sys",  # 内核/设备信息
-                "/run",  # 运行时数据
-                "/var/log",  # 系统日志
-                "/Volumes",  # macOS 挂载卷
-                "/Applications",  # macOS 应用
-                "/Library",  # macOS 库
-            ]
-
-            # 检查原始路径和解析后的路径
-            for allowed_path in allowed_system_paths:
-                if str(resolved).startswith(allowed_path) or path_str.startswith(
-                    allowed_path
-                ):
-                    return True
+        # 2. 检查路径遍历深度（允许合理的父目录访问）
+        # 最多3级父目录，且解析后仍在项目目录的3级父目录内
+        if (
+            ".." in path_str
+            and Path(path_str).parts.count("..") <= 3
+            and _is_under(resolved_str, self._max_parent_str)
+        ):
+            return True
 
-            # 4. 允许用户主目录访问（只读）
-            user_home = str(Path.home())
-            if str(resolved).startswith(user_home):
-                # 检查是否是危险操作（如删除用户主目录）
-                # 这里只做基本检查，具体操作在check_command中检查
-                return True
+        # 3. 允许特定的系统目录访问（只读或临时操作）
+        # 检查原始路径和解析后的路径
+        if resolved_str.startswith(_ALLOWED_SYSTEM_PREFIXES) or path_str.startswith(
+            _ALLOWED_SYSTEM_PREFIXES
+        ):
+            return True
 
-            # 5. 默认拒绝其他项目目录外的访问
-            return False
+        # 4. 允许用户主目录访问（只读）
+        # 这里只做基本检查，具体操作（如删除用户主目录）在check_command中检查
+        if resolved_str.startswith(self._user_home_str):
+            return True
 
-        except Exception:
-            # 路径解析失败，保守起见拒绝
-            return False
+        # 5. 默认拒绝其他项目目录外的访问
+        return False
 
     def _ask_user_confirmation(self, command: str, reason: str) -> bool:
         """询问用户确认危险操作"""
@@ -982,83 +1258,6 @@ class SafetyGuard:
             print("\n❌ User cancelled operation")
             return False
 
-    def _extract_command_name(self, cmd_path: str) -> str:
-        """
-        从命令路径中提取命令名称
-
-        处理以下情况：
-        - python3 -> python
-        - ./script.sh -> script.sh
-        - .venv/bin/python -> python
-        - /usr/bin/python3 -> python
-        - pip3 -> pip
-
-        Args:
-            cmd_path: 命令路径
-
-        Returns:
-            命令名称
-        """
-        # 获取路径的最后一部分（文件名）
-        cmd_name = Path(cmd_path).name
-
-        # Windows 命令变体：echo. echo: echo; 等（Windows 下 echo. 打印空行）
-        # 提取 . : ; 之前的部分作为命令名
-        import re as _re
-        base_match = _re.match(r'^([a-zA-Z]+)[.:;]', cmd_name)
-        if base_match:
-            cmd_name = base_match.group(1)
-
-        # 命令映射：将变体映射到基础命令
-        command_mapping = {
-            "python": ["python", "python2", "python3"],
-            "pip": ["pip", "pip2", "pip3"],
-        }
-
-        # 检查精确匹配
-        for base_cmd, variants in command_mapping.items():
-            if cmd_name in variants or any(cmd_name.startswith(v) for v in variants):
-                return base_cmd
-
-        # 对于其他命令，检查前缀匹配
-        base_commands = {
-            "node",
-            "npm",
-            "npx",
-            "yarn",
-            "ruby",
-            "gem",
-            "bundle",
-            "java",
-            "javac",
-            "go",
-            "cargo",
-            "rustc",
-            "php",
-            "composer",
-            "pytest",
-            "unittest",
-        }
-
-        for base_cmd in base_commands:
-            if cmd_name.startswith(base_cmd):
-                return base_cmd
-
-        # 去除进程替换 (<(...) 或 >(...)) 中 shlex 合并到 token 尾部的 )
-        # 去除子 shell 分组 (...) 中 shlex 合并到 token 头部的 (
-        # 只剥离多余的括号，保留单独的 (、)、((、)) 等 shell 关键字
-        if cmd_name.startswith('(') and len(cmd_name) > 1:
-            cmd_name = cmd_name[1:]
-        if cmd_name.endswith(')') and len(cmd_name) > 1:
-            cmd_name = cmd_name[:-1]
-
-        # 去除版本/工具链后缀: gcc-12 → gcc, openssl@3 → openssl, docker-compose-v1 → docker-compose
-        _ver_match = _re.match(r'^(.+?)[\-@]v?\d+(\.\d+)*$', cmd_name)
-        if _ver_match:
-            cmd_name = _ver_match.group(1)
-
-        return cmd_name.lower()
-
     def _is_project_executable(self, cmd_path: str) -> bool:
         """
         检查是否是项目内的可执行文件
@@ -1074,6 +1273,9 @@ class SafetyGuard:
         Returns:
             是否是项目内的可执行文件
         """
+        if cmd_path in self._project_exec_cache:
+            return True
+
         # 如果是相对路径且在项目目录内
         if not cmd_path.startswith("/"):
             # 检查是否在项目目录内
@@ -1082,12 +1284,11 @@ class SafetyGuard:
                 if full_path.exists():
                     # 检查是否在项目目录内
                     resolved = full_path.resolve()
-                    project_root = Path(self.project_root).resolve()
-                    try:
-                        resolved.relative_to(project_root)
+                    if _is_under(str(resolved), self._project_root_str):
+                        # 只缓存命中结果：新建的脚本仍会被重新检查
+                        self._project_exec_cache.add(cmd_path)
                         return True
-                    except ValueError:
-                        return False
+                    return False
             except Exception:
                 pass
 
@@ -1125,6 +1326,15 @@ class SafetyGuard:
         result.update(kwargs)
         return result
 
+    def _verdict(self, allowed: bool, reason: str, risk_level: str) -> Dict[str, Any]:
+        """构建不带附加字段的检查结果（常见路径，省去 **kwargs 的开销）"""
+        return {
+            "allowed": allowed,
+            "reason": reason,
+            "risk_level": risk_level,
+            "needs_confirmation": False,
+        }
+
     def _protect_quoted_pipes(self, command: str) -> str:
         """将引号内的 | 替换为哨兵字符，避免 _split_pipeline 误判为 shell 管道"""
         result = []
@@ -1500,59 +1710,72 @@ class SafetyGuard:
             return self.RISK_UNKNOWN, f"Command not in whitelist: {cmd_name}"
 
         # Shell 控制流关键字：纯语法结构，无直接文件操作，视为安全
-        shell_keywords = {
-            "for", "if", "while", "until", "case", "select", "function",
-            "[", "[[", "(", ")", "((", "))", "<<<", "{", "}", "declare", "typeset", "local", "let", "readonly",
-            "done", "esac", "fi", "then", "else", "elif", "do", "in",
-            ":", "true", "false",
-        }
-        if cmd_name in shell_keywords:
+        if cmd_name in self._SHELL_KEYWORDS:
             return self.RISK_SAFE, "Shell keyword/control flow"
 
         # 2. 检查危险命令模式（已经在check_command中检查过）
         # 3. 根据命令类型评估风险
+        if cmd_name in self._HIGH_RISK:
+            return self.RISK_WARNING, self._HIGH_RISK[cmd_name]
 
-        # 高风险命令（需要特别检查）
-        high_risk_commands = {
-            "rm": "File deletion",
-            "sudo": "Privilege escalation",
-            "chmod": "Permission change",
-            "chown": "Ownership change",
-            "dd": "Disk operation",
-            "format": "Disk format",
-            "mkfs": "Create filesystem",
-            "shutdown": "System shutdown",
-            "halt": "System halt",
-            "reboot": "System reboot",
-            "pkill": "Process termination",
-            "kill": "Process termination",
-            "iptables": "Firewall config",
-            "ufw": "Firewall management",
-        }
-
-        if cmd_name in high_risk_commands:
-            return self.RISK_WARNING, high_risk_commands[cmd_name]
-
-        # 中风险命令（可能需要确认）
-        medium_risk_commands = {
-            "pip": "Python package manager",
-            "pip3": "Python package manager",
-            "npm": "Node.js package manager",
-            "yarn": "Node.js package manager",
-            "apt": "System package manager",
-            "apt-get": "System package manager",
-            "docker": "Container operations",
-            "docker-compose": "Container orchestration",
-            "systemctl": "System service management",
-            "service": "Service management",
-        }
-
-        if cmd_name in medium_risk_commands:
-            return self.RISK_WARNING, medium_risk_commands[cmd_name]
+        if cmd_name in self._MEDIUM_RISK:
+            return self.RISK_WARNING, self._MEDIUM_RISK[cmd_name]
 
         # 低风险命令（安全）
         return self.RISK_SAFE, "Safe command"
 
+    def _handle_dangerous(
+        self, command: str, description: str, pattern: str, ask_confirmation: bool
+    ) -> Optional[Dict[str, Any]]:
+        """按 dangerous_command_action 处理命中的危险操作
+
+        Returns:
+            结果字典；未知的处理方式返回 None，继续后续检查
+        """
+        # 根据配置处理危险命令
+        if self.dangerous_command_action == "reject":
+            return self._build_result(
+                allowed=False,
+                reason=f"Dangerous operation detected: {description}",
+                risk_level=self.RISK_DANGEROUS,
+                pattern=pattern,
+            )
+        elif self.dangerous_command_action == "ask":
+            # 询问用户确认
+            if self.interactive and ask_confirmation:
+                if self._ask_user_confirmation(
+                    command, f"Dangerous operation: {description}"
+                ):
+                    print(f"✅ User confirmed execution of dangerous command")
+                    return self._verdict(
+                        True,
+                        f"Dangerous operation confirmed: {description}",
+                        self.RISK_WARNING,
+                    )
+                else:
+                    return self._verdict(
+                        False,
+                        "User cancelled operation",
+                        self.RISK_DANGEROUS,
+                    )
+            else:
+                # 非交互模式，拒绝执行
+                return self._build_result(
+                    allowed=False,
+                    reason=f"Dangerous operation detected: {description} (confirm in interactive mode)",
+                    risk_level=self.RISK_DANGEROUS,
+                    pattern=pattern,
+                )
+        elif self.dangerous_command_action == "log":
+            # 记录日志但允许执行
+            _log.warning("Dangerous operation detected (logged): %s", description)
+            return self._verdict(
+                True,
+                f"Dangerous operation logged: {description}",
+                self.RISK_WARNING,
+            )
+        return None
+
     def check_command(
         self, command: str, ask_confirmation: bool = True,
         _skip_newline_split: bool = False,
@@ -1570,6 +1793,83 @@ class SafetyGuard:
             - risk_level: 风险等级 (safe/warning/dangerous/unknown)
             - needs_confirmation: 是否需要用户确认
         """
+        # 不会弹出确认时结果只取决于命令本身和当前目录，可以复用
+        cwd = None if self.interactive and ask_confirmation else os.getcwd()
+        return self._check_command_cached(
+            command, ask_confirmation, _skip_newline_split, cwd
+        )
+
+    def check_commands_batch(
+        self, commands: List[str], ask_confirmation: bool = True
+    ) -> Dict[str, Any]:
+        """批量检查多条命令，遇到第一条被拒绝的命令即返回其结果
+
+        当前目录只取一次，重复出现的命令只检查一次。
+
+        Returns:
+            第一条被拒绝命令的检查结果；全部通过时返回汇总结果（风险等级取最高）
+        """
+        cwd = None if self.interactive and ask_confirmation else os.getcwd()
+        final_risk = self.RISK_SAFE
+        checked: Set[str] = set()
+        for command in commands:
+            if command in checked:
+                continue
+            checked.add(command)
+            result = self._check_command_cached(command, ask_confirmation, False, cwd)
+            if not result["allowed"]:
+                return result
+            risk = result.get("risk_level", self.RISK_SAFE)
+            if risk == self.RISK_DANGEROUS:
+                final_risk = self.RISK_DANGEROUS
+            elif risk == self.RISK_WARNING and final_risk != self.RISK_DANGEROUS:
+                final_risk = self.RISK_WARNING
+        return self._verdict(True, "All commands passed safety check", final_risk)
+
+    def _check_command_cached(
+        self,
+        command: str,
+        ask_confirmation: bool,
+        _skip_newline_split: bool,
+        cwd: Optional[str],
+    ) -> Dict[str, Any]:
+        """带结果缓存的 check_command，cwd 为 None 表示不可缓存（会弹出确认）"""
+        if cwd is None:
+            return self._check_command(command, ask_confirmation, _skip_newline_split)
+
+        key = (command, ask_confirmation, _skip_newline_split, cwd)
+        cached = self._verdict_cache.get(key)
+        if cached is not None:
+            self._verdict_cache.move_to_end(key)
+            return dict(cached)
+
+        # 嵌套检查（管道段、多行命令）的文件系统依赖向外层传递
+        outer_fs_dependent = self._fs_dependent
+        self._fs_dependent = False
+        try:
+            result = self._check_command(command, ask_confirmation, _skip_newline_split)
+        finally:
+            fs_dependent = self._fs_dependent
+            self._fs_dependent = outer_fs_dependent or fs_dependent
+
+        # 只缓存不依赖文件系统的安全放行结果：被拒绝的命令（如尚未创建的脚本）下次重新检查，
+        # "log" 模式下放行的危险命令每次都要重新输出警告，
+        # 解析过路径的结果在符号链接等变化后可能失效
+        if (
+            not fs_dependent
+            and result.get("allowed")
+            and result.get("risk_level") == self.RISK_SAFE
+            and not result.get("needs_confirmation")
+        ):
+            self._verdict_cache[key] = dict(result)
+            if len(self._verdict_cache) > self._VERDICT_CACHE_SIZE:
+                self._verdict_cache.popitem(last=False)
+        return result
+
+    def _check_command(
+        self, command: str, ask_confirmation: bool, _skip_newline_split: bool
+    ) -> Dict[str, Any]:
+        """check_command 的实际检查逻辑（不经过结果缓存）"""
         # 去除多余空格
         command = command.strip()
 
@@ -1584,19 +1884,14 @@ class SafetyGuard:
                 break
         else:
             if any(l.strip().startswith('#') for l in lines):
-                return self._build_result(
-                    allowed=True, reason="Command is only comments",
-                    risk_level=self.RISK_SAFE,
-                )
+                return self._verdict(True, "Command is only comments", self.RISK_SAFE)
             # All lines are empty/whitespace – fall through to empty check below
         if first_non_comment > 0:
             command = '\n'.join(lines[first_non_comment:]).strip()
 
         # 空命令
         if not command:
-            return self._build_result(
-                allowed=False, reason="Empty command", risk_level=self.RISK_DANGEROUS
-            )
+            return self._verdict(False, "Empty command", self.RISK_DANGEROUS)
 
         # 合并 \ 行续接符（shell line continuation）
         # 将结尾带 \ 的行与下一行合并，方便后续 shlex 正确解析参数
@@ -1618,77 +1913,70 @@ class SafetyGuard:
                         final_risk = self.RISK_DANGEROUS
                     elif seg_risk == self.RISK_WARNING and final_risk != self.RISK_DANGEROUS:
                         final_risk = self.RISK_WARNING
-                return self._build_result(
-                    allowed=True,
-                    reason="All commands passed safety check",
-                    risk_level=final_risk,
+                return self._verdict(
+                    True,
+                    "All commands passed safety check",
+                    final_risk,
                 )
 
         # 检查危险模式
-        for pattern, description in self.dangerous_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                # 根据配置处理危险命令
-                if self.dangerous_command_action == "reject":
-                    return self._build_result(
-                        allowed=False,
-                        reason=f"Dangerous operation detected: {description}",
-                        risk_level=self.RISK_DANGEROUS,
-                        pattern=pattern,
-                    )
-                elif self.dangerous_command_action == "ask":
-                    # 询问用户确认
-                    if self.interactive and ask_confirmation:
-                        if self._ask_user_confirmation(
-                            command, f"Dangerous operation: {description}"
-                        ):
-                            print(f"✅ User confirmed execution of dangerous command")
-                            return self._build_result(
-                                allowed=True,
-                                reason=f"Dangerous operation confirmed: {description}",
-                                risk_level=self.RISK_WARNING,
-                            )
-                        else:
-                            return self._build_result(
-                                allowed=False,
-                                reason="User cancelled operation",
-                                risk_level=self.RISK_DANGEROUS,
-                            )
-                    else:
-                        # 非交互模式，拒绝执行
-                        return self._build_result(
-                            allowed=False,
-                            reason=f"Dangerous operation detected: {description} (confirm in interactive mode)",
-                            risk_level=self.RISK_DANGEROUS,
-                            pattern=pattern,
-                        )
-                elif self.dangerous_command_action == "log":
-                    # 记录日志但允许执行
-                    print(f"⚠️  Warning: dangerous operation detected (logged): {description}")
-                    return self._build_result(
-                        allowed=True,
-                        reason=f"Dangerous operation logged: {description}",
-                        risk_level=self.RISK_WARNING,
-                    )
+        # 非 ASCII 命令一律扫描：IGNORECASE 的 Unicode 大小写折叠与 str.lower() 不完全一致
+        dangerous_hit = None
+        lowered = command.lower()
+        if (
+            not command.isascii() or any(lit in lowered for lit in _DANGEROUS_LITERALS)
+        ) and _DANGEROUS_UNION_RE.search(command):
+            dangerous_hit = next(
+                (p, desc)
+                for regex, p, desc in _DANGEROUS_COMPILED
+                if regex.search(command)
+            )
+        if dangerous_hit:
+            pattern, description = dangerous_hit
+            handled = self._handle_dangerous(
+                command, description, pattern, ask_confirmation
+            )
+            if handled is not None:
+                return handled
+
+        # 快速路径：不含任何 shell 元字符的纯输出命令（ls/cat/echo 等）
+        # 跳过解析、风险评估和路径检查，结果与完整检查一致
+        # 只对 ASCII 命令启用：str.split() 会按 Unicode 空白（如 \xa0）分割，与完整检查不一致
+        words = command.split()
+        if (
+            command.isascii()
+            and words[0] in _TRIVIALLY_SAFE
+            and _FAST_PATH_UNSAFE.isdisjoint(command)
+        ):
+            return self._verdict(True, "Command safety check passed", self.RISK_SAFE)
 
         # 解析命令
         command = self._protect_quoted_pipes(command)
         try:
             try:
-                parts = shlex.split(command)
+                # 没有引号/转义时 shlex 的结果与按空白分割一致，直接走快速路径
+                if command.isascii() and _SHELL_META.isdisjoint(command):
+                    parts = command.split()
+                else:
+                    parts = shlex.split(command)
             except ValueError:
                 # shlex.split 在遇到未闭合引号时会失败（Windows 下常见，如 echo it's done）
                 # fallback 到简单空格分割，提取第一个词作为命令名
                 parts = command.split()
             if not parts:
-                return self._build_result(
-                    allowed=False, reason="Unable to parse command", risk_level=self.RISK_DANGEROUS
+                return self._verdict(
+                    False,
+                    "Unable to parse command",
+                    self.RISK_DANGEROUS,
                 )
 
             # 拆分管道/分隔符，每个段独立检查
             segments = self._split_pipeline(parts)
             if not segments:
-                return self._build_result(
-                    allowed=False, reason="No valid command segments", risk_level=self.RISK_DANGEROUS
+                return self._verdict(
+                    False,
+                    "No valid command segments",
+                    self.RISK_DANGEROUS,
                 )
 
             if len(segments) > 1:
@@ -1703,9 +1991,7 @@ class SafetyGuard:
                         final_risk = self.RISK_DANGEROUS
                     elif seg_risk == self.RISK_WARNING and final_risk != self.RISK_DANGEROUS:
                         final_risk = self.RISK_WARNING
-                return self._build_result(
-                    allowed=True, reason="All pipeline segments passed", risk_level=final_risk
-                )
+                return self._verdict(True, "All pipeline segments passed", final_risk)
 
             cmd_path = parts[0]
 
@@ -1774,10 +2060,10 @@ class SafetyGuard:
                             cmd_path = subshell_command
                         else:
                             # $((...)) 算术展开或空 $()，纯变量赋值，放行
-                            return self._build_result(
-                                allowed=True,
-                                reason="Variable assignment with shell expansion",
-                                risk_level=self.RISK_SAFE,
+                            return self._verdict(
+                                True,
+                                "Variable assignment with shell expansion",
+                                self.RISK_SAFE,
                             )
                     else:
                         # 展开后还有命令（如 export VAR=$(cmd); actual_cmd）
@@ -1788,20 +2074,20 @@ class SafetyGuard:
                             if subshell_command:
                                 cmd_path = subshell_command
                             else:
-                                return self._build_result(
-                                    allowed=True,
-                                    reason="Variable assignment with shell expansion",
-                                    risk_level=self.RISK_SAFE,
+                                return self._verdict(
+                                    True,
+                                    "Variable assignment with shell expansion",
+                                    self.RISK_SAFE,
                                 )
                         else:
                             cmd_path = parts[actual_cmd_index]
                             parts = parts[actual_cmd_index:]
                 elif actual_cmd_index >= parts_len:
                     # 纯变量赋值（如 VAR=value），无害，放行
-                    return self._build_result(
-                        allowed=True,
-                        reason="Environment variable assignment only",
-                        risk_level=self.RISK_SAFE,
+                    return self._verdict(
+                        True,
+                        "Environment variable assignment only",
+                        self.RISK_SAFE,
                     )
                 else:
                     # 跳过赋值 token，使用后续 token 作为实际命令
@@ -1811,92 +2097,90 @@ class SafetyGuard:
             # 处理命令取反模式: ! command
             if cmd_path == "!":
                 if len(parts) <= 1:
-                    return self._build_result(
-                        allowed=True,
-                        reason="Bare negation operator",
-                        risk_level=self.RISK_SAFE,
-                    )
+                    return self._verdict(True, "Bare negation operator", self.RISK_SAFE)
                 cmd_path = parts[1]
                 parts = parts[1:]
 
             # 处理重定向符号前置模式: > file cmd, 2>/dev/null cmd, <<< "str" cmd 等
             # 重定向符号（独立或与文件路径合并）不是命令，应跳过找到实际命令
             # 独立操作符需要跳过操作符+目标共 2 个 token；合并操作符只需跳过 1 个 token
-            _redir_standalone_skip2 = {"<", ">", ">>", "<<", "<<<", ">|"}
-            _redir_merged_skip1 = re.compile(r'^[0-9]*[<>]|&[<>]|<>|<&|>&|>\||<<-')
             while parts:
-                if cmd_path in _redir_standalone_skip2:
+                if cmd_path in self._REDIR_STANDALONE:
                     if len(parts) > 2:
                         cmd_path = parts[2]
                         parts = parts[2:]
                     else:
-                        return self._build_result(
-                            allowed=True,
-                            reason="Redirection without command",
-                            risk_level=self.RISK_SAFE,
+                        return self._verdict(
+                            True,
+                            "Redirection without command",
+                            self.RISK_SAFE,
                         )
-                elif _redir_merged_skip1.match(cmd_path):
+                elif _REDIR_MERGED_RE.match(cmd_path):
                     if len(parts) > 1:
                         cmd_path = parts[1]
                         parts = parts[1:]
                     else:
-                        return self._build_result(
-                            allowed=True,
-                            reason="Redirection only (no command)",
-                            risk_level=self.RISK_SAFE,
+                        return self._verdict(
+                            True,
+                            "Redirection only (no command)",
+                            self.RISK_SAFE,
                         )
                 elif cmd_path in self.allowed_commands:
                     break
                 elif re.match(r'^[|&;]+$', cmd_path):
-                    return self._build_result(
-                        allowed=True,
-                        reason="Shell separator after redirections",
-                        risk_level=self.RISK_SAFE,
+                    return self._verdict(
+                        True,
+                        "Shell separator after redirections",
+                        self.RISK_SAFE,
                     )
                 else:
                     break
 
             # 提取命令名称（智能处理路径）
-            cmd_name = self._extract_command_name(cmd_path)
+            cmd_name = _extract_command_name(cmd_path)
+            # 本次检查内复用当前工作目录
+            cwd = Path.cwd()
 
             # 评估风险等级
             risk_level, risk_reason = self._assess_risk_level(cmd_name, command, parts)
 
             # 检查是否是项目内的可执行文件
             if self._is_project_executable(cmd_path):
+                self._fs_dependent = True
                 # 项目内的可执行文件，检查基础命令名
                 if cmd_name in self.allowed_commands:
-                    print(f"✅ Allowed project executable: {cmd_path}")
-                    return self._build_result(
-                        allowed=True,
-                        reason=f"Project executable: {cmd_name}",
-                        risk_level=self.RISK_SAFE,
+                    if _log.isEnabledFor(logging.DEBUG):
+                        _log.debug("Allowed project executable: %s", cmd_path)
+                    return self._verdict(
+                        True,
+                        f"Project executable: {cmd_name}",
+                        self.RISK_SAFE,
                     )
                 else:
                     # 对于项目内的脚本，如果是常见扩展名则允许
-                    allowed_extensions = {".sh", ".py", ".js", ".rb", ".pl"}
-                    if any(cmd_path.endswith(ext) for ext in allowed_extensions):
-                        print(f"✅ Allowed project script: {cmd_path}")
-                        return self._build_result(
-                            allowed=True,
-                            reason="Project script file",
-                            risk_level=self.RISK_SAFE,
+                    if cmd_path.endswith(self._SCRIPT_EXTENSIONS):
+                        if _log.isEnabledFor(logging.DEBUG):
+                            _log.debug("Allowed project script: %s", cmd_path)
+                        return self._verdict(
+                            True,
+                            "Project script file",
+                            self.RISK_SAFE,
                         )
 
             # 识别复合命令内的语法片段（不是实际命令），直接放行
             # case 分支标签如 01)、a)、*.txt) 等：) 不是合法命令名字符
             # 已剥离 ) 后剩纯数字如 01 也是 case 标签，不是命令
             if cmd_path.endswith(')') and len(cmd_path) > 1:
-                return self._build_result(
-                    allowed=True,
-                    reason="Case pattern (syntax fragment, not a command)",
-                    risk_level=self.RISK_SAFE,
+                return self._verdict(
+                    True,
+                    "Case pattern (syntax fragment, not a command)",
+                    self.RISK_SAFE,
                 )
             if re.match(r'^\d+$', cmd_path):
-                return self._build_result(
-                    allowed=True,
-                    reason="Numeric case pattern (syntax fragment, not a command)",
-                    risk_level=self.RISK_SAFE,
+                return self._verdict(
+                    True,
+                    "Numeric case pattern (syntax fragment, not a command)",
+                    self.RISK_SAFE,
                 )
 
             # 检查是否在白名单中
@@ -1905,21 +2189,15 @@ class SafetyGuard:
                     allowed=False,
                     reason=f"Command not in whitelist: {cmd_name}",
                     risk_level=self.RISK_UNKNOWN,
-                    suggestion=f"Available commands: {', '.join(sorted(list(self.allowed_commands)))}",
+                    suggestion=f"Available commands: {_ALLOWED_SUGGESTION}",
                 )
 
             # Shell 控制流关键字：跳过后续特殊检查和路径检查，直接放行
-            shell_keywords = {
-                "for", "if", "while", "until", "case", "select", "function",
-                "[", "[[", "(", ")", "((", "))", "<<<", "{", "}", "declare", "typeset", "local", "let", "readonly",
-                "done", "esac", "fi", "then", "else", "elif", "do", "in",
-                ":", "true", "false",
-            }
-            if cmd_name in shell_keywords:
-                return self._build_result(
-                    allowed=True,
-                    reason=f"Shell keyword/control flow: {cmd_name}",
-                    risk_level=self.RISK_SAFE,
+            if cmd_name in self._SHELL_KEYWORDS:
+                return self._verdict(
+                    True,
+                    f"Shell keyword/control flow: {cmd_name}",
+                    self.RISK_SAFE,
                 )
 
             # 特殊检查：rm命令（智能检查）
@@ -1931,7 +2209,7 @@ class SafetyGuard:
 
                 for i, part in enumerate(parts):
                     if part.startswith("-"):
-                        if any(c in part for c in "rR"):
+                        if "r" in part or "R" in part:
                             has_recursive = True
                         if "f" in part:
                             has_force = True
@@ -1943,22 +2221,8 @@ class SafetyGuard:
                         target_path = part
 
                         # 检查是否是极度危险的删除目标
-                        dangerous_patterns = [
-                            "/",
-                            "/*",
-                            "~",
-                            "~/*",
-                            "/etc",
-                            "/var",
-                            "/usr",
-                            "/bin",
-                            "/sbin",
-                            "/lib",
-                        ]
-                        if any(
-                            target_path == pattern
-                            or target_path.startswith(pattern + "/")
-                            for pattern in dangerous_patterns
+                        if target_path in _RM_DANGEROUS_TARGETS or target_path.startswith(
+                            _RM_DANGEROUS_PREFIXES
                         ):
                             return {
                                 "allowed": False,
@@ -1980,13 +2244,12 @@ class SafetyGuard:
                                     # 相对路径，检查是否包含路径遍历
                                     if ".." in target_path:
                                         # 解析相对路径
-                                        resolved_path = (Path.cwd() / target_path).resolve()
-                                        project_root = Path(self.project_root).resolve()
+                                        self._fs_dependent = True
+                                        resolved_path = (cwd / target_path).resolve()
                                         # 检查是否在项目目录内
-                                        try:
-                                            resolved_path.relative_to(project_root)
-                                        except ValueError:
-                                            # 不在项目目录内
+                                        if not _is_under(
+                                            str(resolved_path), self._project_root_str
+                                        ):
                                             dangerous_targets.append(target_path)
                             except Exception:
                                 # 路径解析失败，保守起见视为危险
@@ -2036,30 +2299,22 @@ class SafetyGuard:
                     return {"allowed": True, "reason": "sudo command (relaxed mode)"}
 
                 # 只允许特定的sudo命令
-                allowed_sudo_commands = {
-                    "apt",
-                    "apt-get",
-                    "dpkg",
-                    "systemctl",
-                    "service",
-                    "pip",
-                    "pip3",
-                    "npm",
-                    "yarn",
-                }
                 if len(parts) > 1:
                     sub_cmd = parts[1].lower()
-                    if sub_cmd not in allowed_sudo_commands:
+                    if sub_cmd not in self._ALLOWED_SUDO_COMMANDS:
                         return {
                             "allowed": False,
                             "reason": f"sudo command '{sub_cmd}' not in allowed list",
-                            "suggestion": f"Allowed sudo commands: {', '.join(allowed_sudo_commands)}",
+                            "suggestion": f"Allowed sudo commands: {', '.join(self._ALLOWED_SUDO_COMMANDS)}",
                         }
 
                     # 允许安装操作，但在交互模式下需要用户确认
-                    if any(
-                        install_keyword in " ".join(parts).lower()
-                        for install_keyword in ["install", "add", "update", "upgrade"]
+                    joined = " ".join(parts).lower()
+                    if (
+                        "install" in joined
+                        or "add" in joined
+                        or "update" in joined
+                        or "upgrade" in joined
                     ):
                         if ask_confirmation and self.interactive:
                             if not self._ask_user_confirmation(
@@ -2155,16 +2410,13 @@ class SafetyGuard:
 
             # 特殊检查：pip/pip3命令（允许大部分操作）
             if cmd_name in ["pip", "pip3"]:
-                print(f"📦 Detected pip command: {' '.join(parts)}")
+                if _log.isEnabledFor(logging.DEBUG):
+                    _log.debug("Detected pip command: %s", " ".join(parts))
                 # 允许所有常见pip操作，只禁止明确危险的
                 if len(parts) > 1:
                     pip_action = parts[1].lower()
                     # 只禁止明确危险的操作
-                    forbidden_pip_actions = {
-                        "download",
-                        "wheel",
-                    }  # 这些可能下载大量文件
-                    if pip_action in forbidden_pip_actions:
+                    if pip_action in self._FORBIDDEN_PIP_ACTIONS:
                         return {
                             "allowed": False,
                             "reason": f"pip operation '{pip_action}' may produce many files",
@@ -2175,36 +2427,15 @@ class SafetyGuard:
 
             # 特殊检查：npm/yarn命令（允许大部分操作）
             if cmd_name in ["npm", "yarn", "npx", "pnpm"]:
-                print(f"📦 Detected {cmd_name} command: {' '.join(parts)}")
+                if _log.isEnabledFor(logging.DEBUG):
+                    _log.debug("Detected %s command: %s", cmd_name, " ".join(parts))
                 # 允许所有常见操作
                 return {"allowed": True, "reason": f"{cmd_name} operation"}
 
-            # 纯输出命令：只写 stdout/stderr，不可能写文件，完全跳过路径检查
-            output_only_commands = {
-                "echo", "printf", "true", "false", "yes", "seq", "expr", "bc", "dc",
-                "basename", "dirname", "realpath", "readlink", "pwd",
-                "cat", "wc", "sort", "uniq", "cut", "tr", "fold", "rev", "nl", "fmt",
-                "grep", "rg", "ag", "find", "sed", "awk",
-                "strings", "od", "hexdump", "xxd", "jq", "yq", "diff",
-                "cksum", "sum", "md5sum", "sha256sum", "shasum", "base64", "iconv",
-                "uname", "arch", "hostname", "uptime", "dmesg",
-                "lscpu", "lsblk", "lsusb", "lspci", "getconf", "locale",
-                "id", "who", "w", "last", "groups",
-                "ls", "file", "stat", "du", "df", "ps", "top", "htop",
-                "head", "tail", "less", "more",
-                "which", "whereis", "date", "cal", "locate", "mlocate",
-                "man", "info", "tldr", "apropos", "whatis",
-                "logger", "tput", "stty",
-                # 解释器：脚本路径检查无实际安全意义，脚本本身可任意操作
-                "python", "python3", "node", "ruby", "java",
-                # 目录导航：仅改变 shell 状态，不读写文件
-                "cd", "pushd", "popd", "dirs",
-            }
-
             # 子命令委托：元命令的子命令若是纯输出型，整个命令跳过路径检查
             # 例如 git grep → grep 在 output_only，则 git grep 也视为纯输出
             actual_cmd = cmd_name
-            if cmd_name not in output_only_commands and len(parts) > 1:
+            if cmd_name not in self._OUTPUT_ONLY_CMDS and len(parts) > 1:
                 # 跳过前导全局标志找到子命令（如 git -C /path grep ...）
                 sub_idx = 1
                 while sub_idx < len(parts) and parts[sub_idx].startswith("-"):
@@ -2218,14 +2449,15 @@ class SafetyGuard:
                     ):
                         sub_idx += 1
                 if sub_idx < len(parts):
-                    sub_cmd = self._extract_command_name(parts[sub_idx])
-                    if sub_cmd in output_only_commands:
+                    sub_cmd = _extract_command_name(parts[sub_idx])
+                    if sub_cmd in self._OUTPUT_ONLY_CMDS:
                         actual_cmd = sub_cmd
 
-            if actual_cmd not in output_only_commands:
+            if actual_cmd not in self._OUTPUT_ONLY_CMDS:
                 # 检查路径参数（使用新的is_safe_path方法）
                 # 对于awk, sed等命令，参数可能是正则表达式而非路径
-                regex_commands = {"awk", "sed", "grep", "rg", "ag", "find"}
+                # 重复的参数只检查一次；每个路径都要解析（可能经由符号链接逃出项目）
+                checked: Set[str] = set()
 
                 for i, part in enumerate(parts):
                     # 跳过命令本身
@@ -2242,7 +2474,7 @@ class SafetyGuard:
                         # 对于awk/sed/grep等命令，跳过正则表达式参数
                         # 条件1: 包含 { } (awk 的典型语法)
                         if (
-                            cmd_name in regex_commands
+                            cmd_name in self._REGEX_CMDS
                             and "/" in part
                             and ("{" in part or "'" in part or '"' in part)
                         ):
@@ -2270,55 +2502,38 @@ class SafetyGuard:
                         ):
                             continue
 
+                        if part in checked:
+                            continue
+                        checked.add(part)
+
+                        self._fs_dependent = True
                         try:
-                            # 解析路径
-                            if not part.startswith("/"):
-                                test_path = (Path.cwd() / part).resolve()
-                            else:
-                                test_path = Path(part).resolve()
+                            # 解析路径（绝对路径 join 后保持不变）
+                            test_path = Path(os.path.realpath(os.path.join(cwd, part)))
 
                             # 使用新的is_safe_path方法检查
                             if not self.is_safe_path(test_path):
-                                # 对于某些只读命令，允许访问系统文件
-                                readonly_commands = {
-                                    "sysctl", "journalctl",
-                                }
-
-                                # 对于只读命令，允许访问（但会记录警告）
-                                if cmd_name in readonly_commands:
-                                    print(
-                                        f"⚠️  Warning: {cmd_name} access outside project directory: {part}"
+                                # 对于只读命令，允许访问系统文件（但会记录警告）
+                                if cmd_name in self._READONLY_CMDS:
+                                    _log.warning(
+                                        "%s access outside project directory: %s",
+                                        cmd_name,
+                                        part,
                                     )
                                     continue
 
                                 # 对于临时目录操作，允许
-                                tmp_prefixes = ["/tmp", "/var/tmp", "/private/tmp"]
-                                if any(
-                                    str(test_path).startswith(prefix)
-                                    for prefix in tmp_prefixes
-                                ):
-                                    if cmd_name in ["mkdir", "touch", "rm", "cp", "mv"]:
-                                        print(
-                                            f"⚠️  Warning: {cmd_name} operating in temp directory: {part}"
+                                if str(test_path).startswith(_TMP_PREFIXES):
+                                    if cmd_name in self._FS_MUTATORS:
+                                        _log.warning(
+                                            "%s operating in temp directory: %s",
+                                            cmd_name,
+                                            part,
                                         )
                                         continue
 
                                 # 对于包管理器，允许系统路径
-                                package_managers = {
-                                    "apt", "apt-get", "dpkg",
-                                    "yum", "dnf",
-                                    "brew",
-                                    "pip", "pip3", "pipx",
-                                    "npm", "yarn", "pnpm",
-                                    "cargo", "go", "gem", "bundle",
-                                    "dotnet",
-                                    "conda", "mamba",
-                                    "pacman", "zypper",
-                                    "flatpak", "snap", "apk",
-                                    "pkg", "port",
-                                    "cpan", "luarocks", "composer",
-                                }
-                                if cmd_name in package_managers:
+                                if cmd_name in self._PACKAGE_MANAGERS:
                                     continue
 
                                 # 其他情况拒绝
@@ -2333,15 +2548,13 @@ class SafetyGuard:
                             continue
 
             # 使用评估的风险等级
-            return self._build_result(
-                allowed=True, reason="Command safety check passed", risk_level=risk_level
-            )
+            return self._verdict(True, "Command safety check passed", risk_level)
 
         except Exception as e:
-            return self._build_result(
-                allowed=False,
-                reason=f"Command parsing error: {str(e)}",
-                risk_level=self.RISK_DANGEROUS,
+            return self._verdict(
+                False,
+                f"Command parsing error: {str(e)}",
+                self.RISK_DANGEROUS,
             )
 
     def is_safe_content(self, content: str, file_path: str) -> bool:
@@ -2350,55 +2563,40 @@ class SafetyGuard:
         if len(content) > 10 * 1024 * 1024:  # 10MB
             return False
 
-        # 检查是否包含二进制数据
-        try:
-            content.encode("utf-8")
-        except UnicodeEncodeError:
+        # 检查是否包含二进制数据：NUL 字符，或无法编码为 UTF-8 的孤立代理项
+        # （直接扫描字符串，不为校验生成一份完整的 UTF-8 拷贝）
+        if "\x00" in content:
+            return False
+        if not content.isascii() and _SURROGATE_RE.search(content):
             return False
 
-        # 根据文件类型进行特定检查
-        if file_path.endswith(".py"):
-            return self._check_python_code(content)
-        elif file_path.endswith(".sh"):
-            return self._check_shell_script(content)
+        # 根据文件类型进行特定检查（两种扩展名都是 3 个字符，按后缀查表）
+        checker = self._CONTENT_CHECKERS.get(file_path[-3:])
+        if checker is not None:
+            return checker(self, content)
 
         return True
 
     def _check_python_code(self, code: str) -> bool:
         """检查Python代码安全性"""
+        # 危险导入/调用都必然包含名称的最后一段（system、popen 等），
+        # 代码中一个都没有时无需解析 AST（含 NUL 的代码仍交给 ast.parse 报错）。
+        # 只对 ASCII 代码走捷径：Python 会对标识符做 NFKC 归一化（ｓｙｓｔｅｍ -> system）
+        if (
+            code.isascii()
+            and "\x00" not in code
+            and not any(leaf in code for leaf in self._dangerous_leaves)
+        ):
+            return True
+
         try:
-            # 解析AST
+            # 解析AST，遍历时命中第一个危险导入/调用即停止
             tree = ast.parse(code)
-
-            # 检查危险导入
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        full_name = name.name
-                        if full_name in self.dangerous_imports:
-                            return False
-
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    for name in node.names:
-                        full_name = f"{module}.{name.name}" if module else name.name
-                        if full_name in self.dangerous_imports:
-                            return False
-
-                # 检查危险函数调用
-                elif isinstance(node, ast.Call):
-                    if isinstance(node.func, ast.Attribute):
-                        # 检查os.system等
-                        func_name = ""
-                        if hasattr(node.func, "value") and isinstance(
-                            node.func.value, ast.Name
-                        ):
-                            func_name = f"{node.func.value.id}.{node.func.attr}"
-                        if func_name in self.dangerous_imports:
-                            return False
-
+            _DangerousCodeFinder(self.dangerous_imports).visit(tree)
             return True
 
+        except _UnsafeCode:
+            return False
         except SyntaxError:
             # 语法错误，但不是安全问题
             return True
@@ -2409,21 +2607,17 @@ class SafetyGuard:
         """检查Shell脚本安全性"""
         # 先合并 \ 续行符，确保续行的命令作为一个整体被检查
         script = self._merge_line_continuations(script)
-        lines = script.split("\n")
 
-        for line in lines:
-            line = line.strip()
-
-            # 跳过注释和空行
-            if not line or line.startswith("#"):
-                continue
+        # 跳过注释和空行，其余每一行作为一条命令批量检查
+        commands = [
+            line
+            for line in map(str.strip, script.split("\n"))
+            if line and not line.startswith("#")
+        ]
+        return self.check_commands_batch(commands)["allowed"]
 
-            # 检查每一行命令
-            check_result = self.check_command(line)
-            if not check_result["allowed"]:
-                return False
-
-        return True
+    # is_safe_content 按文件后缀分派的内容检查
+    _CONTENT_CHECKERS = {".py": _check_python_code, ".sh": _check_shell_script}
 
     def is_safe_python_code(self, code: str) -> bool:
         """专门检查要执行的Python代码"""
@@ -2436,17 +2630,7 @@ class SafetyGuard:
             return False
 
         # 检查资源消耗
-        dangerous_patterns = [
-            r"import\s+multiprocessing",
-            r"import\s+threading",
-            r"\.start\(\)",
-            r"\.join\(\)",
-            r"Pool\(",
-            r"Process\(",
-        ]
-
-        for pattern in dangerous_patterns:
-            if re.search(pattern, code):
-                return False
+        if _PYTHON_RESOURCE_RE.search(code):
+            return False
 
         return True
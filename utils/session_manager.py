@@ -9,19 +9,58 @@
 """
 
 import asyncio
+import atexit
+import heapq
 import json
+import mmap
 import os
 import sys
-from typing import Dict, List, Any, Optional
+from typing import IO, Callable, Dict, List, Any, Optional, Union
 from pathlib import Path
 from datetime import datetime
 import uuid
-from dataclasses import dataclass
+import weakref
+from dataclasses import asdict, dataclass
+from functools import lru_cache
 from aacode.i18n import t
 
+_loads: Callable[[Union[str, bytes]], Any]
+
+try:
+    import orjson
+
+    def _dumps(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+    def _dumps(data: Any) -> bytes:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+    _loads = json.loads
+
+
+def _dumps_line(data: Any) -> bytes:
+    """序列化为单行 JSON（JSONL 记录），不含换行符；dataclass 实例按字段序列化"""
+    if orjson is not None:
+        # orjson 在 C 层直接遍历 dataclass 字段，不需要中间 dict
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_DATACLASS)
+    return json.dumps(data, ensure_ascii=False, default=asdict).encode("utf-8")
+
+
+# 进程内共享的 tiktoken 编码：加载需读取 BPE 合并表（数百毫秒），
+# SessionManager / ReActLoop 等多个实例复用同一个对象。加载超时或失败也记录为 None，
+# 避免每个实例都再等待一次超时
+_ENCODING_CACHE: Dict[str, Any] = {}
+
 
 def _load_tiktoken_encoding():
-    """加载 tiktoken 编码，支持镜像下载，添加超时保护"""
+    """加载 tiktoken 编码（进程内缓存），支持镜像下载，添加超时保护"""
+    if "cl100k_base" in _ENCODING_CACHE:
+        return _ENCODING_CACHE["cl100k_base"]
+
     import os
     import threading
 
@@ -53,6 +92,7 @@ def _load_tiktoken_encoding():
 
     if t.is_alive():
         print(f"\n⚠️ tiktoken loading timeout, using simple estimation")
+        _ENCODING_CACHE["cl100k_base"] = None
         return None
 
     if exception[0]:
@@ -69,11 +109,23 @@ def _load_tiktoken_encoding():
                 f"   Manual fix: https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken"
             )
             print(f"   Save to: ~/Library/Caches/tiktoken/cl100k_base.tiktoken")
+        _ENCODING_CACHE["cl100k_base"] = None
         return None
 
+    _ENCODING_CACHE["cl100k_base"] = result[0]
     return result[0]
 
 
+# 短文本 token 数缓存：系统提示、固定回复等重复文本只编码一次
+_TOKEN_CACHE_MAX_TEXT = 16 * 1024
+
+
+@lru_cache(maxsize=4096)
+def _cached_token_len(encoding, text: str) -> int:
+    """按 (encoding, text) 缓存的 token 计数"""
+    return len(encoding.encode(text))
+
+
 def _ensure_iso_timestamp(ts: Any) -> str:
     """统一时间戳为 ISO 8601 字符串（如 "2026-05-28T09:16:11"），兼容旧版 float。
 
@@ -94,13 +146,18 @@ def _timestamp_sort_key(ts: Any) -> float:
         return 0.0
 
 
-def _atomic_file_write(filepath, write_func):
+def _atomic_file_write(filepath, write_func, binary: bool = False):
     """Atomically write to file using temp file + os.replace"""
     import tempfile
 
     tmp_fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, suffix='.tmp')
+    f: IO[Any]
     try:
-        with os.fdopen(tmp_fd, 'w', encoding='utf-8') as f:
+        if binary:
+            f = os.fdopen(tmp_fd, 'wb')
+        else:
+            f = os.fdopen(tmp_fd, 'w', encoding='utf-8')
+        with f:
             write_func(f)
         os.replace(tmp_path, filepath)
     except Exception:
@@ -111,6 +168,60 @@ def _atomic_file_write(filepath, write_func):
         raise
 
 
+def read_session_messages(sessions_dir: Path, session_id: str) -> Optional[List[Dict]]:
+    """读取会话消息列表，会话不存在时返回 None
+
+    优先读取 JSONL 日志（{session_id}.jsonl，每行一条消息），
+    不存在时回退到旧版整文件 JSON（{session_id}.json）。
+    """
+    log_file = sessions_dir / f"{session_id}.jsonl"
+    if log_file.exists():
+        messages: List[Dict] = []
+        with open(log_file, "rb") as f:
+            # 内存映射逐行解析，不把整个日志读成一个大字符串
+            if os.fstat(f.fileno()).st_size == 0:
+                return messages
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b""):
+                    if not line.strip():
+                        continue
+                    try:
+                        messages.append(_loads(line))
+                    except ValueError:
+                        # 进程中断时可能留下不完整的最后一行，跳过
+                        continue
+        return messages
+
+    legacy_file = sessions_dir / f"{session_id}.json"
+    if legacy_file.exists():
+        with open(legacy_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if orjson is not None:
+                    # orjson 可直接解析 memoryview，省去一次整文件拷贝
+                    with memoryview(mm) as view:
+                        data = orjson.loads(view)
+                else:
+                    data = json.loads(mm[:])
+        # 旧版文件同时存了 structured_messages 和 messages（collapsed text），
+        # structured_messages 存在时以它为准
+        return data.get("structured_messages") or data.get("messages", [])
+    return None
+
+
+def _log_ends_cleanly(log_file: Path) -> bool:
+    """JSONL 日志存在且以换行结尾（没有中断写入留下的半行），可以直接追加"""
+    try:
+        with open(log_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+    except OSError:
+        return False
+
+
 def _merge_sessions_index(filepath, our_data):
     """Read disk index, merge with our data, write atomically under a file lock.
 
@@ -120,14 +231,12 @@ def _merge_sessions_index(filepath, our_data):
     Our data takes priority for same keys, but we preserve entries
     from disk that we don't know about (added by other processes).
     """
-    import json as _json
     from aacode.utils.file_lock import file_lock
 
     def _read_disk():
         if filepath.exists():
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    return _json.load(f)
+                return _loads(filepath.read_bytes())
             except Exception:
                 pass
         return {}
@@ -135,13 +244,30 @@ def _merge_sessions_index(filepath, our_data):
     with file_lock(filepath):
         disk_data = _read_disk()
         merged = {**disk_data, **our_data}
-        _atomic_file_write(
-            filepath,
-            lambda f: _json.dump(merged, f, indent=2, ensure_ascii=False),
-        )
+        payload = _dumps(merged)
+        _atomic_file_write(filepath, lambda f: f.write(payload), binary=True)
+
+
+# 存活的 SessionManager 实例，进程退出时统一检查（实例被回收后自动移除）
+_LIVE_MANAGERS: "weakref.WeakSet[SessionManager]" = weakref.WeakSet()
+
+
+def _flush_managers_at_exit():
+    """atexit 钩子：仍有未保存修改的会话同步写回消息日志和索引，保证两者一致"""
+    for manager in list(_LIVE_MANAGERS):
+        if manager._dirty:
+            manager._dirty = False
+            if manager.current_session_id:
+                manager._write_session_log(
+                    manager.current_session_id, manager.current_messages
+                )
+            manager._save_sessions_index()
+
+
+atexit.register(_flush_managers_at_exit)
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionMessage:
     """会话消息"""
 
@@ -154,7 +280,19 @@ class SessionMessage:
     reasoning_content: Optional[str] = None         # assistant 消息的 reasoning_content
 
 
-@dataclass
+def _message_entry(msg: SessionMessage) -> Dict[str, Any]:
+    """转换为 LLM API / 客户端使用的消息 dict，只包含非空的结构化字段"""
+    entry = {"role": msg.role, "content": msg.content}
+    if msg.tool_calls:
+        entry["tool_calls"] = msg.tool_calls
+    if msg.tool_call_id:
+        entry["tool_call_id"] = msg.tool_call_id
+    if msg.reasoning_content:
+        entry["reasoning_content"] = msg.reasoning_content
+    return entry
+
+
+@dataclass(slots=True)
 class SessionSummary:
     """会话摘要"""
 
@@ -185,9 +323,33 @@ class SessionManager:
         # 会话索引
         self.sessions_index: Dict[str, SessionSummary] = {}
 
+        # 写盘：_save_lock 保证后发起的保存最后落盘；add_message 的保存合并延迟执行
+        self._save_lock = asyncio.Lock()
+        self._save_task: Optional[asyncio.Task] = None
+        self._dirty = False
+
+        # 事件循环结束时延迟保存可能来不及执行，进程退出前由模块级钩子写回
+        _LIVE_MANAGERS.add(self)
+
+        # 已写入 JSONL 日志的消息：(会话ID, 消息列表, 条数)，用于只追加新消息
+        self._persisted: Optional[tuple] = None
+
+        # get_messages 的 dict 视图缓存（见 _sync_message_views）
+        self._views_messages: Optional[List[SessionMessage]] = None
+        self._views_all: List[Dict] = []
+        self._views_no_system: List[Dict] = []
+
+        # current_session.txt 中的创建时间：(会话ID, 格式化字符串)
+        self._created_display: tuple = ("", "")
+
         # token计数器（惰性加载，首次 _count_tokens 时才加载）
         self._encoding = None
 
+        # 当前会话总token数的增量统计状态（见 _get_total_tokens）
+        self._tokens_messages: Optional[List[SessionMessage]] = None
+        self._tokens_counted = 0
+        self._tokens_total = 0
+
         # 加载会话索引
         self._load_sessions_index()
 
@@ -196,13 +358,12 @@ class SessionManager:
         index_file = self.sessions_dir / "sessions_index.json"
         if index_file.exists():
             try:
-                with open(index_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    for session_id, session_data in data.items():
-                        # 兼容旧版 float 时间戳，反序列化时统一转为 ISO 8601 字符串
-                        session_data["created_at"] = _ensure_iso_timestamp(session_data.get("created_at", ""))
-                        session_data["last_activity"] = _ensure_iso_timestamp(session_data.get("last_activity", ""))
-                        self.sessions_index[session_id] = SessionSummary(**session_data)
+                data = _loads(index_file.read_bytes())
+                for session_id, session_data in data.items():
+                    # 兼容旧版 float 时间戳，反序列化时统一转为 ISO 8601 字符串
+                    session_data["created_at"] = _ensure_iso_timestamp(session_data.get("created_at", ""))
+                    session_data["last_activity"] = _ensure_iso_timestamp(session_data.get("last_activity", ""))
+                    self.sessions_index[session_id] = SessionSummary(**session_data)
             except Exception as e:
                 print(t("session.load_error", e=str(e)))
 
@@ -233,26 +394,66 @@ class SessionManager:
             self._encoding = _load_tiktoken_encoding()
         if self._encoding:
             try:
-                return len(self._encoding.encode(text))
+                # 超长文本不进缓存，避免把大字符串长期留在内存里
+                if len(text) > _TOKEN_CACHE_MAX_TEXT:
+                    return len(self._encoding.encode(text))
+                return _cached_token_len(self._encoding, text)
             except Exception:
                 pass
         # 回退到简单估算（大致4字符=1token）
         return len(text) // 4
 
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """批量计算多段文本的token数量（一次 encode_batch，tiktoken 内部多线程）"""
+        if not texts:
+            return []
+        if self._encoding is None:
+            self._encoding = _load_tiktoken_encoding()
+        if self._encoding:
+            try:
+                return [
+                    len(tokens)
+                    for tokens in self._encoding.encode_batch(
+                        texts, num_threads=os.cpu_count() or 1
+                    )
+                ]
+            except Exception:
+                pass
+        return [len(text) // 4 for text in texts]
+
     def _get_total_tokens(self) -> int:
-        """获取当前会话的总token数"""
-        return sum(msg.tokens for msg in self.current_messages)
+        """获取当前会话的总token数
+
+        增量维护：只累加上次统计之后追加的消息。current_messages 被整体替换
+        （加载/切换/删除会话）或变短时重新全量统计。调用方（如 main_agent）
+        可能直接 append 到 current_messages，因此不依赖 add_message 维护计数。
+        """
+        messages = self.current_messages
+        counted = self._tokens_counted
+        if messages is not self._tokens_messages or len(messages) < counted:
+            self._tokens_messages = messages
+            self._tokens_total = 0
+            self._tokens_counted = counted = 0
+        if len(messages) > counted:
+            self._tokens_total += sum(msg.tokens for msg in messages[counted:])
+            self._tokens_counted = len(messages)
+        return self._tokens_total
 
     async def create_session(self, task: str, title: Optional[str] = None) -> str:
         """创建新会话"""
-        session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        # 先落盘当前会话尚未保存的延迟写入
+        await self._flush_dirty()
+
+        # 会话ID、创建时间、首条消息时间共用同一个时刻
+        now_dt = datetime.now()
+        session_id = f"session_{now_dt.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
 
         # 生成标题
         if title is None:
             title = task[:50] + "..." if len(task) > 50 else task
 
         # 创建会话摘要
-        now = datetime.now().isoformat(timespec='seconds')
+        now = now_dt.isoformat(timespec='seconds')
         session_summary = SessionSummary(
             session_id=session_id,
             created_at=now,
@@ -279,7 +480,7 @@ class SessionManager:
             user_msg = SessionMessage(
                 role="user",
                 content=task,
-                timestamp=datetime.now().isoformat(timespec='seconds'),
+                timestamp=now,
                 tokens=self._count_tokens(task),
             )
             self.current_messages.append(user_msg)
@@ -302,16 +503,26 @@ class SessionManager:
         if not self.current_session_id:
             return
 
+        session_id = self.current_session_id
         current_session_file = self.sessions_dir.parent / "current_session.txt"
         try:
+            summary = self.sessions_index[session_id]
+            # 创建时间在会话内不变，格式化结果按会话缓存
+            if self._created_display[0] != session_id:
+                self._created_display = (
+                    session_id,
+                    datetime.fromisoformat(summary.created_at).strftime('%Y-%m-%d %H:%M:%S'),
+                )
             content = (
-                f"Session ID: {self.current_session_id}\n"
-                f"Created: {datetime.fromisoformat(self.sessions_index[self.current_session_id].created_at).strftime('%Y-%m-%d %H:%M:%S')}\n"
-                f"Title: {self.sessions_index[self.current_session_id].title}\n"
+                f"Session ID: {session_id}\n"
+                f"Created: {self._created_display[1]}\n"
+                f"Title: {summary.title}\n"
                 f"Messages: {len(self.current_messages)}\n"
                 f"Tokens: {self._get_total_tokens()}\n"
             )
-            _atomic_file_write(current_session_file, lambda f: f.write(content))
+            await asyncio.to_thread(
+                _atomic_file_write, current_session_file, lambda f: f.write(content)
+            )
         except Exception as e:
             print(t("session.save_id_error", e=str(e)))
 
@@ -325,12 +536,13 @@ class SessionManager:
         if not self.current_session_id:
             return False
 
-        # 添加消息
+        # 添加消息（消息时间与会话最后活动时间相同）
+        now = datetime.now().isoformat(timespec='seconds')
         new_tokens = self._count_tokens(content)
         message = SessionMessage(
             role=role,
             content=content,
-            timestamp=datetime.now().isoformat(timespec='seconds'),
+            timestamp=now,
             tokens=new_tokens,
             tool_calls=tool_calls,
             tool_call_id=tool_call_id,
@@ -342,21 +554,50 @@ class SessionManager:
         # 更新会话摘要
         if self.current_session_id in self.sessions_index:
             session_summary = self.sessions_index[self.current_session_id]
-            session_summary.last_activity = datetime.now().isoformat(timespec='seconds')
+            session_summary.last_activity = now
             session_summary.total_messages = len(self.current_messages)
             session_summary.total_tokens = self._get_total_tokens()
             # 如果 title 为空，用第一条 user 消息作为标题
             if role == "user" and (not session_summary.title or session_summary.title.strip() == ""):
                 session_summary.title = content[:50] + ("..." if len(content) > 50 else "")
 
-        # 保存
+        # 保存（连续添加的多条消息合并为一次写盘）
+        self._schedule_save()
+
+        return True
+
+    def _schedule_save(self, delay: float = 0.2):
+        """标记当前会话已修改，并安排一次延迟保存"""
+        self._dirty = True
+        if not self._save_task or self._save_task.done():
+            self._save_task = asyncio.create_task(self._debounced_save(delay))
+
+    async def _debounced_save(self, delay: float):
+        """等待一小段时间后统一写盘（会话文件、索引、当前会话ID）"""
+        await asyncio.sleep(delay)
+        # 写盘期间新增的消息只会重新置 _dirty（任务未结束时不再安排新任务），这里一并写完
+        while self._dirty:
+            await self._flush_dirty()
+
+    async def _flush_dirty(self):
+        if not self._dirty:
+            return
+        self._dirty = False
         await self._save_session()
         self._save_sessions_index()
-
-        # 更新当前会话ID文件
         await self._save_current_session_id()
 
-        return True
+    async def flush(self):
+        """等待挂起的会话保存完成"""
+        if self._save_task and not self._save_task.done():
+            await self._save_task
+        # 等待期间（或上一次写盘过程中）新增的修改同样写完再返回
+        while self._dirty:
+            await self._flush_dirty()
+
+    async def close(self):
+        """关闭会话管理器：落盘所有延迟保存的数据"""
+        await self.flush()
 
     async def get_messages(
         self, session_id: Optional[str] = None, include_system: bool = True
@@ -374,23 +615,28 @@ class SessionManager:
         if target_session_id != self.current_session_id:
             await self._load_session(target_session_id)
 
-        messages = []
-        for msg in self.current_messages:
-            # include_system=False 是关键兼容机制：
-            # 1. 过滤旧版占位 system（不再创建，但旧数据可能残留）
-            # 2. 过滤 LLM 生成的压缩摘要 system（仅在需要完整上下文时 include_system=True）
-            if not include_system and msg.role == "system":
-                continue
-            entry = {"role": msg.role, "content": msg.content}
-            if msg.tool_calls:
-                entry["tool_calls"] = msg.tool_calls
-            if msg.tool_call_id:
-                entry["tool_call_id"] = msg.tool_call_id
-            if msg.reasoning_content:
-                entry["reasoning_content"] = msg.reasoning_content
-            messages.append(entry)
+        # include_system=False 是关键兼容机制：
+        # 1. 过滤旧版占位 system（不再创建，但旧数据可能残留）
+        # 2. 过滤 LLM 生成的压缩摘要 system（仅在需要完整上下文时 include_system=True）
+        self._sync_message_views()
+        return list(self._views_all if include_system else self._views_no_system)
 
-        return messages
+    def _sync_message_views(self):
+        """增量维护 get_messages 的 dict 视图
+
+        消息追加后不再修改，每条消息的 dict 只构建一次；与 _get_total_tokens 一样
+        按 current_messages 列表本身跟踪，列表被替换或变短时重建。
+        """
+        messages = self.current_messages
+        if messages is not self._views_messages or len(messages) < len(self._views_all):
+            self._views_messages = messages
+            self._views_all = []
+            self._views_no_system = []
+        for msg in messages[len(self._views_all):]:
+            entry = _message_entry(msg)
+            self._views_all.append(entry)
+            if msg.role != "system":
+                self._views_no_system.append(entry)
 
     async def get_conversation_history(self, max_length: int = 10) -> str:
         """获取对话历史（用于显示给用户）"""
@@ -411,11 +657,14 @@ class SessionManager:
 
         return "\n".join(history_lines)
 
-    async def _compact_context(self):
+    async def _compact_context(self) -> int:
         """检查上下文 token 使用量，记录警告但不修改持久化数据。
 
         持久化的全量消息不可破坏，真正的压缩由 react_loop._build_compact_view
         在传入模型时执行（round-aware 压缩视图）。
+
+        Returns:
+            当前会话的总 token 数（调用方无需再次统计）
         """
         current_tokens = self._get_total_tokens()
         if current_tokens > self.max_tokens * 0.8:
@@ -423,43 +672,67 @@ class SessionManager:
                 f"⚠️ Session token count ({current_tokens}) approaching limit ({self.max_tokens}). "
                 f"Full data preserved; model-input compression handled by react_loop."
             )
+        return current_tokens
 
     async def _save_session(self):
-        """保存当前会话（单轨：messages 数组包含全部结构化字段）"""
+        """保存当前会话（单轨：JSONL 日志每行一条消息，包含全部结构化字段）"""
         if not self.current_session_id:
             return
 
-        session_file = self.sessions_dir / f"{self.current_session_id}.json"
+        async with self._save_lock:
+            await self._write_session_file()
 
-        session_data = {
-            "session_id": self.current_session_id,
-            "created_at": self.sessions_index.get(
-                self.current_session_id, SessionSummary("", "", "", 0, 0, 0, "", "")
-            ).created_at,
-            "messages": [
-                {
-                    "role": msg.role,
-                    "content": msg.content,
-                    "timestamp": msg.timestamp,
-                    "tokens": msg.tokens,
-                    "tool_calls": msg.tool_calls,
-                    "tool_call_id": msg.tool_call_id,
-                    "reasoning_content": msg.reasoning_content,
-                }
-                for msg in self.current_messages
-            ],
-        }
+    async def _write_session_file(self):
+        """在加锁状态下把新消息写入 JSONL 日志（在线程中执行，不阻塞事件循环）"""
+        # 在事件循环线程中取当前会话，写盘期间切换会话不影响本次写入
+        session_id = self.current_session_id
+        if session_id:
+            await asyncio.to_thread(
+                self._write_session_log, session_id, self.current_messages
+            )
+
+    def _write_session_log(self, session_id: str, messages: List[SessionMessage]):
+        """把会话的新消息同步写入 JSONL 日志
+
+        同一消息列表只追加上次保存之后新增的消息（每条一行）；
+        消息列表被替换或变短（新建/加载旧版会话等）时整体原子重写。
+        """
+        log_file = self.sessions_dir / f"{session_id}.jsonl"
+        persisted = self._persisted
+        append = (
+            persisted is not None
+            and persisted[0] == session_id
+            and persisted[1] is messages
+            and persisted[2] <= len(messages)
+            and log_file.exists()
+        )
+        start = persisted[2] if append and persisted is not None else 0
+        # 上次保存之后没有新消息：日志已是最新，不写盘
+        if append and start == len(messages):
+            return
+
+        # SessionMessage 的字段即 JSONL 记录的字段，直接序列化，不构建中间 dict
+        records = messages[start:]
 
         try:
-            _atomic_file_write(
-                session_file,
-                lambda f: json.dump(session_data, f, indent=2, ensure_ascii=False)
-            )
+            payload = b"".join(_dumps_line(r) + b"\n" for r in records)
+            if append:
+                with open(log_file, "ab") as f:
+                    f.write(payload)
+            else:
+                _atomic_file_write(log_file, lambda f: f.write(payload), binary=True)
+                # 旧版整文件 JSON 已迁移到 JSONL
+                legacy_file = log_file.with_suffix(".json")
+                if legacy_file.exists():
+                    legacy_file.unlink()
+            self._persisted = (session_id, messages, start + len(records))
         except Exception as e:
+            # 追加可能只写了一部分，下次整体重写
+            self._persisted = None
             print(t("session.save_error", e=str(e)))
 
     async def _load_session(self, session_id: str):
-        """加载指定会话（兼容旧版 collapsed text 格式和 structured_messages 双轨格式）
+        """加载指定会话（JSONL 日志，兼容旧版整文件 JSON 的 collapsed text 和 structured_messages 双轨格式）
 
         兼容性说明：
         - 旧版 session JSON（2026-06-07 之前）的 current_messages[0] 是一条占位 system 消息
@@ -468,22 +741,27 @@ class SessionManager:
           通过 get_messages(include_system=False) 过滤，不会传给 LLM；
           通过 _compact_context 被归类为 system_msgs 保留但无实际影响。
         """
-        session_file = self.sessions_dir / f"{session_id}.json"
-        if not session_file.exists():
-            return False
+        # 替换 current_messages 之前，先落盘当前会话尚未保存的延迟写入
+        await self._flush_dirty()
 
         try:
-            with open(session_file, "r", encoding="utf-8") as f:
-                session_data = json.load(f)
+            raw_messages = read_session_messages(self.sessions_dir, session_id)
+            if raw_messages is None:
+                return False
+            from_log = _log_ends_cleanly(self.sessions_dir / f"{session_id}.jsonl")
 
             self.current_session_id = session_id
             self.current_messages = []
 
-            # ── 旧版兼容（TODO: 下个大版本移除，若确认无旧 structured_messages 会话） ──
-            # 旧版文件同时存了 structured_messages 和 messages（collapsed text）。
-            # 如果 structured_messages 存在，以它为准（它已经是我们需要的结构化格式）；
-            # 否则走 messages 数组。
-            raw_messages = session_data.get("structured_messages") or session_data.get("messages", [])
+            # 旧版文件中缺少 tokens 字段的消息，加载时一次性批量补算
+            missing = [
+                msg_data for msg_data in raw_messages
+                if msg_data.get("tokens") is None and msg_data.get("content")
+            ]
+            if missing:
+                counts = self._count_tokens_batch([m["content"] for m in missing])
+                for msg_data, tokens in zip(missing, counts):
+                    msg_data["tokens"] = tokens
 
             for msg_data in raw_messages:
                 msg_data["timestamp"] = _ensure_iso_timestamp(msg_data.get("timestamp"))
@@ -491,48 +769,62 @@ class SessionManager:
                     role=msg_data["role"],
                     content=msg_data.get("content", ""),
                     timestamp=msg_data["timestamp"],
-                    tokens=msg_data.get("tokens", 0),
+                    tokens=msg_data.get("tokens") or 0,
                     tool_calls=msg_data.get("tool_calls"),
                     tool_call_id=msg_data.get("tool_call_id"),
                     reasoning_content=msg_data.get("reasoning_content"),
                 )
                 self.current_messages.append(message)
 
+            # 从 JSONL 加载的消息已在日志中；旧版 JSON 会在下次保存时迁移为 JSONL
+            self._persisted = (
+                (session_id, self.current_messages, len(self.current_messages))
+                if from_log and not missing
+                else None
+            )
             return True
 
         except Exception as e:
             print(t("session.load_session_error", e=str(e)))
             return False
 
-    async def list_sessions(self) -> List[Dict]:
-        """列出所有会话"""
-        sessions = []
-        for session_summary in self.sessions_index.values():
-            sessions.append(
-                {
-                    "session_id": session_summary.session_id,
-                    "title": session_summary.title,
-                    "created_at": session_summary.created_at,
-                    "last_activity": session_summary.last_activity,
-                    "total_messages": session_summary.total_messages,
-                    "total_tokens": session_summary.total_tokens,
-                    "task_count": session_summary.task_count,
-                    "status": session_summary.status,
-                }
-            )
+    async def list_sessions(self, limit: Optional[int] = None) -> List[Dict]:
+        """列出会话，按最后活动时间倒序
 
-        # 按最后活动时间排序（兼容 str / float 时间戳）
-        sessions.sort(key=lambda x: _timestamp_sort_key(x.get("last_activity")), reverse=True)
-        return sessions
+        Args:
+            limit: 只返回最近的 limit 个会话（用堆取前 K 个，不做全量排序）
+        """
+        # 按最后活动时间排序（兼容 str / float 时间戳），只为返回的会话构建 dict
+        def sort_key(summary: SessionSummary) -> float:
+            return _timestamp_sort_key(summary.last_activity)
+
+        if limit is None:
+            summaries = sorted(self.sessions_index.values(), key=sort_key, reverse=True)
+        else:
+            summaries = heapq.nlargest(limit, self.sessions_index.values(), key=sort_key)
+
+        return [
+            {
+                "session_id": session_summary.session_id,
+                "title": session_summary.title,
+                "created_at": session_summary.created_at,
+                "last_activity": session_summary.last_activity,
+                "total_messages": session_summary.total_messages,
+                "total_tokens": session_summary.total_tokens,
+                "task_count": session_summary.task_count,
+                "status": session_summary.status,
+            }
+            for session_summary in summaries
+        ]
 
     async def switch_session(self, session_id: str) -> bool:
         """切换到指定会话"""
         if session_id not in self.sessions_index:
             return False
 
-        # 保存当前会话
+        # 保存当前会话（包括尚未落盘的延迟保存）
         if self.current_session_id:
-            await self._save_session()
+            await self._flush_dirty()
 
         # 加载目标会话
         success = await self._load_session(session_id)
@@ -548,10 +840,11 @@ class SessionManager:
         if session_id not in self.sessions_index:
             return False
 
-        # 删除会话文件
-        session_file = self.sessions_dir / f"{session_id}.json"
-        if session_file.exists():
-            session_file.unlink()
+        # 删除会话文件（JSONL 日志及旧版 JSON）
+        for suffix in (".jsonl", ".json"):
+            session_file = self.sessions_dir / f"{session_id}{suffix}"
+            if session_file.exists():
+                session_file.unlink()
 
         # 从索引中删除
         del self.sessions_index[session_id]
@@ -583,17 +876,8 @@ class SessionManager:
         if not session_id:
             return {}
 
-        # 加载会话数据
-        session_file = self.sessions_dir / f"{session_id}.json"
-        if not session_file.exists():
-            return {}
-
-        try:
-            with open(session_file, "r", encoding="utf-8") as f:
-                session_summary = json.load(f)
-        except Exception:
-            return {}
-
+        # 摘要信息来自会话索引，会话文件只保存消息
+        session_summary = self.sessions_index.get(session_id)
         if not session_summary:
             return {}
 
@@ -601,12 +885,12 @@ class SessionManager:
 
         return {
             "session_id": session_id,
-            "title": session_summary.get("title", ""),
+            "title": session_summary.title,
             "messages": messages,
-            "total_messages": session_summary.get("total_messages", 0),
-            "total_tokens": session_summary.get("total_tokens", 0),
-            "created_at": session_summary.get("created_at", ""),
-            "last_activity": session_summary.get("last_activity", ""),
+            "total_messages": session_summary.total_messages,
+            "total_tokens": session_summary.total_tokens,
+            "created_at": session_summary.created_at,
+            "last_activity": session_summary.last_activity,
         }
 
     async def count_tokens(self, session_id: Optional[str] = None) -> int:
@@ -617,17 +901,8 @@ class SessionManager:
         if not session_id:
             return 0
 
-        # 加载会话数据
-        session_file = self.sessions_dir / f"{session_id}.json"
-        if not session_file.exists():
-            return 0
-
-        try:
-            with open(session_file, "r", encoding="utf-8") as f:
-                session_data = json.load(f)
-            return session_data.get("total_tokens", 0)
-        except Exception:
-            return 0
+        session_summary = self.sessions_index.get(session_id)
+        return session_summary.total_tokens if session_summary else 0
 
     @property
     def token_limit(self) -> int:
@@ -644,14 +919,13 @@ class SessionManager:
         if not session_id:
             return {"compressed_messages": [], "removed_count": 0}
 
-        original_messages = await self.get_messages(session_id, include_system=False)
-
-        if len(original_messages) <= max_messages:
-            return {"compressed_messages": original_messages, "removed_count": 0}
+        if session_id != self.current_session_id:
+            await self._load_session(session_id)
 
-        # 保留最近的max_messages条消息
-        compressed_messages = original_messages[-max_messages:]
-        removed_count = len(original_messages) - max_messages
+        # 一次遍历筛出非 system 消息，只为保留的最近 max_messages 条构建 dict
+        non_system = [msg for msg in self.current_messages if msg.role != "system"]
+        removed_count = max(len(non_system) - max_messages, 0)
+        compressed_messages = [_message_entry(msg) for msg in non_system[removed_count:]]
 
         return {
             "compressed_messages": compressed_messages,
@@ -663,24 +937,17 @@ class SessionManager:
         if not self.current_session_id:
             return {}
 
-        # 加载会话数据
-        session_file = self.sessions_dir / f"{self.current_session_id}.json"
-        if not session_file.exists():
-            return {}
-
-        try:
-            with open(session_file, "r", encoding="utf-8") as f:
-                session_summary = json.load(f)
-        except Exception:
+        session_summary = self.sessions_index.get(self.current_session_id)
+        if not session_summary:
             return {}
 
         return {
             "session_id": self.current_session_id,
-            "title": session_summary.get("title", ""),
-            "total_messages": session_summary.get("total_messages", 0),
-            "total_tokens": session_summary.get("total_tokens", 0),
+            "title": session_summary.title,
+            "total_messages": session_summary.total_messages,
+            "total_tokens": session_summary.total_tokens,
             "current_tokens": self._get_total_tokens(),
             "max_tokens": self.max_tokens,
-            "created_at": session_summary.get("created_at", ""),
-            "last_activity": session_summary.get("last_activity", ""),
+            "created_at": session_summary.created_at,
+            "last_activity": session_summary.last_activity,
         }
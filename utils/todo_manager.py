@@ -10,15 +10,37 @@ To-Do List管理器
 """
 
 import asyncio
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import aiofiles
 import json
+import logging
 import re
 from aacode.i18n import t
 from aacode.utils.file_lock import file_lock
 
+_log = logging.getLogger(__name__)
+
+_CLEAN_NAME_RE = re.compile(r"[^\w\-_]")
+_ITEM_META_RE = re.compile(r"^- \[ \]\s*([🔴🟡🟢])?\s*\*\*(.*?)\*\*:\s*(.*)")
+_STRIP_META_RE = re.compile(r"^[🔴🟡🟢]\s*\*\*.*?\*\*\s*\[#\w+\]:\s*")
+_STRIP_META_OPT_ID_RE = re.compile(r"^[🔴🟡🟢]\s*\*\*.*?\*\*\s*(\[#\w+\]:\s*)?")
+_TODO_ID_RE = re.compile(r"\[#(t\d+)\]")
+_TODO_NUM_RE = re.compile(r"\[#t(\d+)\]")
+_KEYWORD_SPLIT_RE = re.compile(r"[\s,，。、]+")
+# 行首的复选框（允许前导空白）或一级标题
+_CLASSIFY_RE = re.compile(r"(?m)^(?:[^\S\n]*- \[([ x])\]|# .*)")
+_PRIORITY_MARK = {"high": "🔴", "medium": "🟡", "low": "🟢"}
+_STOP_WORDS = frozenset(
+    {"the", "a", "an", "is", "of", "in", "to", "and", "for", "python", "py"}
+)
+
+# 本进程中已确认存在的待办目录，避免每次构造都 mkdir
+_ENSURED_DIRS: set = set()
+
 
 class TodoManager:
     """To-Do List管理器，支持按 session_id 隔离多个会话"""
@@ -26,7 +48,9 @@ class TodoManager:
     def __init__(self, project_path: Path):
         self.project_path = project_path
         self.todo_dir = project_path / ".aacode" / "todos"
-        self.todo_dir.mkdir(parents=True, exist_ok=True)
+        if self.todo_dir not in _ENSURED_DIRS:
+            self.todo_dir.mkdir(parents=True, exist_ok=True)
+            _ENSURED_DIRS.add(self.todo_dir)
         self.current_todo_file: Optional[Path] = None
         self.todos: List[Dict] = []
         self.todo_counter: int = 0
@@ -34,6 +58,14 @@ class TodoManager:
         self._session_counters: Dict[str, int] = {}
         self._removed_sessions: set = set()
         self._todo_counter_atomic: int = 0
+        # 写操作批处理队列：同一轮事件循环内的并发修改合并为一次读写
+        self._pending: Optional[asyncio.Queue] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._batch_timestamp: str = ""
+        # 已解析的文件行缓存：path -> ((st_mtime_ns, st_size), lines, 段落标题行号)
+        self._lines_cache: Dict[Path, Tuple[Tuple[int, int], List[str], Dict[str, int]]] = {}
+        # 摘要统计缓存：path -> ((st_mtime_ns, st_size), (待办数, 已完成数, 项目名))
+        self._summary_cache: Dict[Path, Tuple[Tuple[int, int], Tuple[int, int, str]]] = {}
         self._load_session_todo_map()
 
     def _session_map_path(self) -> Path:
@@ -124,9 +156,10 @@ class TodoManager:
             if not project_name or project_name == ".":
                 project_name = "project"
 
-        clean_project_name = re.sub(r"[^\w\-_]", "_", project_name)
+        clean_project_name = _CLEAN_NAME_RE.sub("_", project_name)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
         self._todo_counter_atomic += 1
         filename = f"{clean_project_name}_to-do-list_{timestamp}_{self._todo_counter_atomic:04d}.md"
         self.current_todo_file = self.todo_dir / filename
@@ -146,7 +179,7 @@ class TodoManager:
         todo_content = f"""# {clean_project_name} - Todo List
 
 **Task**: {task_description}
-**Created**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}{session_header}
+**Created**: {now.isoformat(sep=" ", timespec="seconds")}{session_header}
 
 ## Todo
 
@@ -161,10 +194,10 @@ class TodoManager:
         except asyncio.CancelledError:
             return ""
         except Exception as e:
-            print(f"⚠️  Failed to create todo list: {e}")
+            _log.warning("⚠️  Failed to create todo list: %s", e)
             return ""
 
-        print(f"📋 Created todo list: {self.current_todo_file.name}")
+        _log.info("📋 Created todo list: %s", self.current_todo_file.name)
         return str(self.current_todo_file.relative_to(self.project_path))
 
     async def add_todo_item(
@@ -172,54 +205,230 @@ class TodoManager:
         session_id: Optional[str] = None,
     ) -> Optional[str]:
         todo_file = self._resolve_todo_file(session_id)
-        if not todo_file or not todo_file.exists():
-            print("⚠️  No active todo list file")
+        if not todo_file:
+            _log.warning("⚠️  No active todo list file")
             return None
 
         try:
-            with file_lock(todo_file):
-                async with aiofiles.open(todo_file, "r", encoding="utf-8") as f:
-                    content = await f.read()
-
-                counter = self._resolve_counter(session_id)
-                if counter == 0:
-                    counter = self._load_counter_from_content(content)
-                    self._set_counter(counter, session_id)
-
-                lines = content.split("\n")
-                insert_pos = -1
-                for i, line in enumerate(lines):
-                    if line.strip() == "## Todo":
-                        insert_pos = i + 1
-                        break
-
-                if insert_pos == -1:
-                    print("⚠️  Todo section not found")
-                    return None
-
-                counter += 1
-                self._set_counter(counter, session_id)
-                todo_id = f"t{counter}"
+            todo_id = await self._submit(
+                "add", todo_file, item, priority, category, session_id
+            )
+            if todo_id and session_id:
+                self._save_session_todo_map()
+            return todo_id
+        except FileNotFoundError:
+            # 不再预先 exists()：文件缺失由读取时的异常直接反映
+            _log.warning("⚠️  No active todo list file")
+            return None
+        except Exception as e:
+            _log.warning("⚠️  Failed to add todo: %s", e)
+            return None
 
-                priority_mark = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(
-                    priority, ""
-                )
-                new_item = f"- [ ] {priority_mark} **{category}** [#{todo_id}]: {item}"
-                lines.insert(insert_pos, new_item)
+    def _apply_add(
+        self, lines: List[str], sections: Dict[str, int], item: str, priority: str,
+        category: str, session_id: Optional[str],
+    ) -> Tuple[Optional[str], int]:
+        counter = self._resolve_counter(session_id)
+        if counter == 0:
+            counter = self._load_counter_from_content("\n".join(lines))
+            self._set_counter(counter, session_id)
+
+        if "## Todo" not in sections:
+            _log.warning("⚠️  Todo section not found")
+            return None, len(lines)
+        insert_pos = sections["## Todo"] + 1
+
+        counter += 1
+        self._set_counter(counter, session_id)
+        todo_id = f"t{counter}"
+
+        priority_mark = _PRIORITY_MARK.get(priority, "")
+        new_item = f"- [ ] {priority_mark} **{category}** [#{todo_id}]: {item}"
+        self._insert_lines(lines, sections, insert_pos, [new_item])
+        return todo_id, insert_pos
+
+    async def _read_text(self, todo_file: Path) -> str:
+        """按字节读取，保证行内容与磁盘字节一一对应（不做换行符转换）"""
+        async with aiofiles.open(todo_file, "rb") as f:
+            return (await f.read()).decode("utf-8")
+
+    async def _load_lines(self, todo_file: Path) -> Tuple[List[str], Dict[str, int]]:
+        """返回文件的行列表和段落标题行号
+
+        文件的 mtime/大小没变时直接复用内存中的解析结果；
+        返回的列表就是缓存本身，修改后需调用 _remember_lines 更新时间戳。
+        """
+        st = os.stat(todo_file)
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._lines_cache.get(todo_file)
+        if cached is not None and cached[0] == stamp:
+            return cached[1], cached[2]
+
+        lines = (await self._read_text(todo_file)).split("\n")
+        sections: Dict[str, int] = {}
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith("## "):
+                sections.setdefault(stripped, i)
+        self._lines_cache[todo_file] = (stamp, lines, sections)
+        return lines, sections
+
+    async def _count_todos_if_exists(
+        self, todo_file: Optional[Path]
+    ) -> Optional[Tuple[int, int, str]]:
+        """同 _count_todos，文件不存在（或未指定）时返回 None"""
+        if todo_file is None:
+            return None
+        try:
+            return await self._count_todos(todo_file)
+        except FileNotFoundError:
+            return None
 
-                async with aiofiles.open(todo_file, "w", encoding="utf-8") as f:
-                    await f.write("\n".join(lines))
+    async def _count_todos(self, todo_file: Path) -> Tuple[int, int, str]:
+        """统计 (待办数, 已完成数, 项目名)
+
+        结果与行缓存使用同一个 (mtime, size) 时间戳，文件没变时直接复用。
+        """
+        lines, _ = await self._load_lines(todo_file)
+        stamp = self._lines_cache[todo_file][0]
+        cached = self._summary_cache.get(todo_file)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        completed_todos = 0
+        pending_todos = 0
+        project_name = None
+
+        # 一个编译好的正则在 C 层扫完全文：同时统计勾选状态并取第一个一级标题
+        for m in _CLASSIFY_RE.finditer("\n".join(lines)):
+            mark = m.group(1)
+            if mark == " ":
+                pending_todos += 1
+            elif mark == "x":
+                completed_todos += 1
+            elif project_name is None:
+                project_name = m.group(0).replace("# ", "").split(" - ")[0]
+        if project_name is None:
+            project_name = "Unknown project"
 
-                if session_id:
-                    self._save_session_todo_map()
+        counts = (pending_todos, completed_todos, project_name)
+        self._summary_cache[todo_file] = (stamp, counts)
+        return counts
+
+    def _remember_lines(self, todo_file: Path, lines: List[str], sections: Dict[str, int]) -> None:
+        st = os.stat(todo_file)
+        self._lines_cache[todo_file] = ((st.st_mtime_ns, st.st_size), lines, sections)
+
+    @staticmethod
+    def _insert_lines(
+        lines: List[str], sections: Dict[str, int], pos: int, texts: List[str]
+    ) -> None:
+        """在 pos 处一次性插入多行，并把位于插入点及之后的段落行号整体后移"""
+        lines[pos:pos] = texts
+        for name, idx in sections.items():
+            if idx >= pos:
+                sections[name] = idx + len(texts)
+
+    async def _rewrite_tail(self, todo_file: Path, lines: List[str], start: int) -> None:
+        """只重写从第 start 行开始的尾部
+
+        前面未变化的部分（标题、任务描述等）原样留在磁盘上，
+        通过 seek 定位到变化处，写入新尾部后截断。
+        """
+        if start >= len(lines):
+            return
+        offset = sum(len(line.encode("utf-8")) + 1 for line in lines[:start])
+        tail = lines[start:]
+        last = tail.pop()
+        async with aiofiles.open(todo_file, "r+b") as f:
+            await f.seek(offset)
+            # 逐行流式写入，不再拼接出整个尾部的临时字符串
+            await f.writelines(line.encode("utf-8") + b"\n" for line in tail)
+            await f.write(last.encode("utf-8"))
+            await f.truncate()
+
+    _BATCH_MAX = 32
+
+    async def _submit(self, op: str, todo_file: Path, *args) -> Any:
+        """把一次修改放入批处理队列，等待其结果"""
+        loop = asyncio.get_running_loop()
+        task = self._flusher_task
+        queue = self._pending
+        if queue is None or task is None or task.done() or task.get_loop() is not loop:
+            queue = self._pending = asyncio.Queue()
+            self._flusher_task = loop.create_task(self._flush_loop(queue))
+        future = loop.create_future()
+        await queue.put((op, todo_file, args, future))
+        return await future
+
+    async def _flush_loop(self, queue: asyncio.Queue) -> None:
+        """后台刷写任务
+
+        取到第一个操作后让出一次事件循环，把同一时刻提交的其他操作一起取出，
+        按文件分组：每个文件只读一次、写一次。
+        """
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(0)
+            while len(batch) < self._BATCH_MAX and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self._apply_batch(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _apply_batch(self, batch: List[Tuple]) -> None:
+        # 同一批次的所有操作共用一个时间戳
+        self._batch_timestamp = datetime.now().isoformat(sep=" ", timespec="seconds")
+        groups: Dict[Path, List[Tuple]] = {}
+        for entry in batch:
+            groups.setdefault(entry[1], []).append(entry)
+
+        for todo_file, ops in groups.items():
+            try:
+                with file_lock(todo_file):
+                    lines, sections = await self._load_lines(todo_file)
+                    first_changed = len(lines)
+                    results = []
+                    for op, _, args, _ in ops:
+                        result, changed = getattr(self, f"_apply_{op}")(lines, sections, *args)
+                        first_changed = min(first_changed, changed)
+                        results.append(result)
+                    if first_changed < len(lines):
+                        await self._rewrite_tail(todo_file, lines, first_changed)
+                        self._remember_lines(todo_file, lines, sections)
+            except Exception as e:
+                # 缓存中的行可能只改了一半，丢弃后下次从磁盘重新加载
+                self._lines_cache.pop(todo_file, None)
+                for *_, future in ops:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
 
-                return todo_id
-        except Exception as e:
-            print(f"⚠️  Failed to add todo: {e}")
-            return None
+            for (*_, future), result in zip(ops, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def flush(self) -> None:
+        """等待队列中所有挂起的修改写入磁盘"""
+        task = self._flusher_task
+        if self._pending is not None and task is not None and not task.done():
+            await self._pending.join()
+
+    async def close(self) -> None:
+        """刷写挂起的修改并停止后台任务"""
+        await self.flush()
+        task, self._flusher_task = self._flusher_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
 
     def _load_counter_from_content(self, content: str) -> int:
-        matches = re.findall(r'\[#t(\d+)\]', content)
+        matches = _TODO_NUM_RE.findall(content)
         if matches:
             return max(int(n) for n in matches)
         return 0
@@ -231,183 +440,162 @@ class TodoManager:
                                    session_id: Optional[str] = None) -> bool:
         todo_file = self._resolve_todo_file(session_id)
         if not todo_file:
-            print("⚠️  No active todo list file")
+            _log.warning("⚠️  No active todo list file")
             return False
 
-        with file_lock(todo_file):
-            async with aiofiles.open(todo_file, "r", encoding="utf-8") as f:
-                content = await f.read()
+        return await self._submit("complete", todo_file, item_pattern, todo_id)
 
-            lines = content.split("\n")
-            updated = False
+    def _apply_complete(
+        self, lines: List[str], sections: Dict[str, int], item_pattern: str,
+        todo_id: Optional[str],
+    ) -> Tuple[bool, int]:
+        updated = False
+        first_changed = len(lines)
 
-            if todo_id:
-                tag = f"[#{todo_id}]"
+        if todo_id:
+            tag = f"[#{todo_id}]"
+            for i, line in enumerate(lines):
+                if tag in line:
+                    if line.strip().startswith("- [x]"):
+                        item_desc = line.replace("- [x]", "").strip()
+                        item_desc = _STRIP_META_RE.sub("", item_desc)
+                        _log.info("⏭️  [#%s] already completed: %.50s...", todo_id, item_desc)
+                        updated = True
+                        break
+                    if line.strip().startswith("- [ ]"):
+                        lines[i] = line.replace("- [ ]", "- [x]", 1)
+                        updated = True
+                        first_changed = min(first_changed, i)
+                        item_desc = line.replace("- [ ]", "").strip()
+                        item_desc = _STRIP_META_RE.sub("", item_desc)
+                        self._add_to_completed_section(lines, sections, [(item_desc, todo_id)])
+                        _log.info("✅ Marked complete [#%s]: %.50s...", todo_id, item_desc)
+                        break
+
+        if not updated and item_pattern:
+            pattern_lower = item_pattern.lower()
+            # 可能命中多项：先收集，最后一次性插入已完成区，避免每次插入都移动整个列表
+            completed = []
+            for i, line in enumerate(lines):
+                if (
+                    line.strip().startswith("- [ ]")
+                    and pattern_lower in line.lower()
+                ):
+                    lines[i] = line.replace("- [ ]", "- [x]", 1)
+                    updated = True
+                    first_changed = min(first_changed, i)
+                    id_match = _TODO_ID_RE.search(line)
+                    matched_id = id_match.group(1) if id_match else None
+                    item_desc = line.replace("- [ ]", "").strip()
+                    item_desc = _STRIP_META_OPT_ID_RE.sub("", item_desc)
+                    completed.append((item_desc, matched_id))
+                    _log.info("✅ Marked complete: %.50s...", item_desc)
+            if completed:
+                self._add_to_completed_section(lines, sections, completed)
+
+        if not updated and item_pattern:
+            pattern_lower = item_pattern.lower()
+            stop_words = _STOP_WORDS
+            raw_words = [w for w in _KEYWORD_SPLIT_RE.split(pattern_lower) if w and len(w) > 1]
+            keywords = []
+            for w in raw_words:
+                if w in stop_words:
+                    continue
+                cleaned = w
+                for sw in stop_words:
+                    cleaned = cleaned.replace(sw, "")
+                if cleaned and len(cleaned) > 1:
+                    keywords.append(cleaned)
+
+            if keywords:
                 for i, line in enumerate(lines):
-                    if tag in line:
-                        if line.strip().startswith("- [x]"):
-                            item_desc = line.replace("- [x]", "").strip()
-                            item_desc = re.sub(r"^[🔴🟡🟢]\s*\*\*.*?\*\*\s*\[#\w+\]:\s*", "", item_desc)
-                            print(f"⏭️  [#{todo_id}] already completed: {item_desc[:50]}...")
-                            updated = True
-                            break
-                        if line.strip().startswith("- [ ]"):
+                    if line.strip().startswith("- [ ]"):
+                        line_lower = line.lower()
+                        if any(kw in line_lower for kw in keywords):
                             lines[i] = line.replace("- [ ]", "- [x]", 1)
                             updated = True
+                            first_changed = min(first_changed, i)
+                            id_match = _TODO_ID_RE.search(line)
+                            matched_id = id_match.group(1) if id_match else None
                             item_desc = line.replace("- [ ]", "").strip()
-                            item_desc = re.sub(r"^[🔴🟡🟢]\s*\*\*.*?\*\*\s*\[#\w+\]:\s*", "", item_desc)
-                            self._add_to_completed_section(lines, item_desc, todo_id)
-                            print(f"✅ Marked complete [#{todo_id}]: {item_desc[:50]}...")
+                            item_desc = _STRIP_META_OPT_ID_RE.sub("", item_desc)
+                            self._add_to_completed_section(lines, sections, [(item_desc, matched_id)])
+                            _log.info("✅ Fuzzy match marked complete: %.50s...", item_desc)
                             break
 
-            if not updated and item_pattern:
-                pattern_lower = item_pattern.lower()
-                for i, line in enumerate(lines):
-                    if (
-                        line.strip().startswith("- [ ]")
-                        and pattern_lower in line.lower()
-                    ):
-                        lines[i] = line.replace("- [ ]", "- [x]", 1)
-                        updated = True
-                        id_match = re.search(r'\[#(t\d+)\]', line)
-                        matched_id = id_match.group(1) if id_match else None
-                        item_desc = line.replace("- [ ]", "").strip()
-                        item_desc = re.sub(r"^[🔴🟡🟢]\s*\*\*.*?\*\*\s*(\[#\w+\]:\s*)?", "", item_desc)
-                        self._add_to_completed_section(lines, item_desc, matched_id)
-                        print(f"✅ Marked complete: {item_desc[:50]}...")
-
-            if not updated and item_pattern:
-                pattern_lower = item_pattern.lower()
-                stop_words = {"the", "a", "an", "is", "of", "in", "to", "and", "for", "python", "py"}
-                raw_words = [w for w in re.split(r'[\s,，。、]+', pattern_lower) if w and len(w) > 1]
-                keywords = []
-                for w in raw_words:
-                    if w in stop_words:
-                        continue
-                    cleaned = w
-                    for sw in stop_words:
-                        cleaned = cleaned.replace(sw, "")
-                    if cleaned and len(cleaned) > 1:
-                        keywords.append(cleaned)
-
-                if keywords:
-                    for i, line in enumerate(lines):
-                        if line.strip().startswith("- [ ]"):
-                            line_lower = line.lower()
-                            if any(kw in line_lower for kw in keywords):
-                                lines[i] = line.replace("- [ ]", "- [x]", 1)
-                                updated = True
-                                id_match = re.search(r'\[#(t\d+)\]', line)
-                                matched_id = id_match.group(1) if id_match else None
-                                item_desc = line.replace("- [ ]", "").strip()
-                                item_desc = re.sub(r"^[🔴🟡🟢]\s*\*\*.*?\*\*\s*(\[#\w+\]:\s*)?", "", item_desc)
-                                self._add_to_completed_section(lines, item_desc, matched_id)
-                                print(f"✅ Fuzzy match marked complete: {item_desc[:50]}...")
-                                break
-
-            if updated:
-                async with aiofiles.open(todo_file, "w", encoding="utf-8") as f:
-                    await f.write("\n".join(lines))
-
-            return updated
-
-    def _add_to_completed_section(self, lines: List[str], item_desc: str, todo_id: Optional[str] = None):
-        completed_section_start = -1
-        for i, line in enumerate(lines):
-            if line.strip() == "## Completed":
-                completed_section_start = i
-                break
+        return updated, first_changed
 
-        if completed_section_start == -1:
+    def _add_to_completed_section(self, lines: List[str], sections: Dict[str, int],
+                                  items: List[Tuple[str, Optional[str]]]):
+        """把 (描述, todo_id) 列表写入已完成区顶部，后完成的排在前面"""
+        if "## Completed" not in sections:
             return
 
-        insert_position = completed_section_start + 1
+        insert_position = sections["## Completed"] + 1
 
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        id_tag = f" [#{todo_id}]" if todo_id else ""
-        new_item = f"- ✅ **{timestamp}**{id_tag}: {item_desc}"
-        lines.insert(insert_position, new_item)
+        timestamp = self._batch_timestamp
+        new_items = []
+        for item_desc, todo_id in reversed(items):
+            id_tag = f" [#{todo_id}]" if todo_id else ""
+            new_items.append(f"- ✅ **{timestamp}**{id_tag}: {item_desc}")
+        self._insert_lines(lines, sections, insert_position, new_items)
 
     async def update_todo_item(self, old_pattern: str, new_item: str,
                                 session_id: Optional[str] = None) -> bool:
         todo_file = self._resolve_todo_file(session_id)
         if not todo_file:
-            print("⚠️  No active todo list file")
+            _log.warning("⚠️  No active todo list file")
             return False
 
-        with file_lock(todo_file):
-            async with aiofiles.open(todo_file, "r", encoding="utf-8") as f:
-                content = await f.read()
+        return await self._submit("update", todo_file, old_pattern, new_item)
 
-            lines = content.split("\n")
-            updated = False
+    def _apply_update(
+        self, lines: List[str], sections: Dict[str, int], old_pattern: str, new_item: str
+    ) -> Tuple[bool, int]:
+        updated = False
+        first_changed = len(lines)
 
-            for i, line in enumerate(lines):
-                if line.strip().startswith("- [ ]") and old_pattern.lower() in line.lower():
-                    match = re.match(
-                        r"^- \[ \]\s*([🔴🟡🟢])?\s*\*\*(.*?)\*\*:\s*(.*)", line
-                    )
-                    if match:
-                        priority_emoji = match.group(1) or ""
-                        category = match.group(2)
-                        lines[i] = f"- [ ] {priority_emoji} **{category}**: {new_item}"
-                    else:
-                        lines[i] = f"- [ ] {new_item}"
-                    updated = True
-                    print(f"🔄 Updated todo: {new_item[:50]}...")
-
-            if updated:
-                async with aiofiles.open(todo_file, "w", encoding="utf-8") as f:
-                    await f.write("\n".join(lines))
+        for i, line in enumerate(lines):
+            if line.strip().startswith("- [ ]") and old_pattern.lower() in line.lower():
+                match = _ITEM_META_RE.match(line)
+                if match:
+                    priority_emoji = match.group(1) or ""
+                    category = match.group(2)
+                    lines[i] = f"- [ ] {priority_emoji} **{category}**: {new_item}"
+                else:
+                    lines[i] = f"- [ ] {new_item}"
+                updated = True
+                first_changed = min(first_changed, i)
+                _log.info("🔄 Updated todo: %.50s...", new_item)
 
-            return updated
+        return updated, first_changed
 
     async def add_execution_record(self, record: str) -> bool:
         return True
 
     async def get_todo_summary(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        empty = {
+            "empty": True,
+            "message": "No todo lists yet, use /newtodo to create a new task",
+        }
         todo_file = self._resolve_todo_file(session_id)
-        if not todo_file or not todo_file.exists():
-            if not session_id:
-                files = await self.list_todo_files()
-                if files:
-                    latest_file = self.todo_dir / files[0]["filename"]
-                    self.current_todo_file = latest_file
-                    todo_file = latest_file
-                else:
-                    return {
-                        "empty": True,
-                        "message": "No todo lists yet, use /newtodo to create a new task",
-                    }
-
-        if not todo_file or not todo_file.exists():
-            return {
-                "empty": True,
-                "message": "No todo lists yet, use /newtodo to create a new task",
-            }
 
         try:
-            async with aiofiles.open(todo_file, "r", encoding="utf-8") as f:
-                content = await f.read()
-
-            total_todos = 0
-            completed_todos = 0
-            pending_todos = 0
-
-            lines = content.split("\n")
-            for line in lines:
-                if line.strip().startswith("- [ ]"):
-                    pending_todos += 1
-                    total_todos += 1
-                elif line.strip().startswith("- [x]"):
-                    completed_todos += 1
-                    total_todos += 1
+            counts = await self._count_todos_if_exists(todo_file)
+            if counts is None or todo_file is None:
+                if session_id:
+                    return empty
+                files = await self.list_todo_files()
+                if not files:
+                    return empty
+                todo_file = self.todo_dir / files[0]["filename"]
+                self.current_todo_file = todo_file
+                counts = await self._count_todos_if_exists(todo_file)
+                if counts is None:
+                    return empty
 
-            project_name = "Unknown project"
-            for line in lines:
-                if line.startswith("# "):
-                    project_name = line.replace("# ", "").split(" - ")[0]
-                    break
+            pending_todos, completed_todos, project_name = counts
+            total_todos = pending_todos + completed_todos
 
             return {
                 "project_name": project_name,
@@ -423,44 +611,57 @@ class TodoManager:
         except Exception as e:
             return {"error": f"Failed to read todo list: {str(e)}"}
 
+    def _probe_todo_file(self, entry: os.DirEntry, rel_dir: str) -> Optional[Dict[str, Any]]:
+        """读取单个待办文件的头部元数据，失败时返回 None
+
+        只读前两行，数据几乎总在页缓存里，直接同步读取比经线程池转发更快。
+        """
+        try:
+            with open(entry.path, "r", encoding="utf-8") as f:
+                first_line = f.readline()
+                second_line = f.readline()
+        except Exception:
+            return None
+
+        project_name = "Unknown project"
+        if first_line.startswith("# "):
+            project_name = first_line.replace("# ", "").split(" - ")[0]
+
+        created_time = "Unknown time"
+        if second_line.startswith("**Created**: "):
+            created_time = second_line.replace("**Created**: ", "").strip()
+
+        try:
+            st = entry.stat()
+            return {
+                "filename": entry.name,
+                "path": os.path.join(rel_dir, entry.name),
+                "project_name": project_name,
+                "created_time": created_time,
+                "size": st.st_size,
+                "modified_time": datetime.fromtimestamp(st.st_mtime).isoformat(),
+            }
+        except Exception:
+            return None
+
     async def list_todo_files(self) -> List[Dict[str, Any]]:
         try:
             todo_files = []
-            for file_path in self.todo_dir.glob("*.md"):
-                try:
-                    async with aiofiles.open(file_path, "r", encoding="utf-8") as f:
-                        first_line = await f.readline()
-                        second_line = await f.readline()
-
-                        project_name = "Unknown project"
-                        if first_line.startswith("# "):
-                            project_name = first_line.replace("# ", "").split(" - ")[0]
-
-                        created_time = "Unknown time"
-                        if second_line.startswith("**Created**: "):
-                            created_time = second_line.replace("**Created**: ", "").strip()
-
-                        todo_files.append(
-                            {
-                                "filename": file_path.name,
-                                "path": str(file_path.relative_to(self.project_path)),
-                                "project_name": project_name,
-                                "created_time": created_time,
-                                "size": file_path.stat().st_size,
-                                "modified_time": datetime.fromtimestamp(
-                                    file_path.stat().st_mtime
-                                ).isoformat(),
-                            }
-                        )
-                except Exception:
-                    continue
+            rel_dir = str(self.todo_dir.relative_to(self.project_path))
+            with os.scandir(self.todo_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".md"):
+                        continue
+                    info = self._probe_todo_file(entry, rel_dir)
+                    if info is not None:
+                        todo_files.append(info)
 
             todo_files.sort(
                 key=lambda x: x.get("modified_time", "") or "", reverse=True
             )
             return todo_files
         except Exception as e:
-            print(f"⚠️ Failed to list todo files: {e}")
+            _log.warning("⚠️ Failed to list todo files: %s", e)
             return []
 
     async def cleanup_old_todos(self, keep_days: int = 30) -> None:
@@ -469,15 +670,25 @@ class TodoManager:
 
             cutoff_time = time.time() - (keep_days * 24 * 3600)
 
-            for todo_file in self.todo_dir.glob("*.md"):
-                if todo_file.stat().st_mtime < cutoff_time:
-                    try:
-                        todo_file.unlink()
-                        print(f"🗑️  Cleaned old todo list: {todo_file.name}")
-                    except Exception as e:
-                        print(f"⚠️ Failed to clean todo list {todo_file.name}: {e}")
+            stale_paths = []
+            with os.scandir(self.todo_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".md") and entry.stat().st_mtime < cutoff_time:
+                        stale_paths.append(entry.path)
+            if not stale_paths:
+                return
+
+            # 批量删除放到线程里执行，避免大量 unlink 阻塞事件循环
+            for path, error in await asyncio.to_thread(_delete_files, stale_paths):
+                name = os.path.basename(path)
+                if error is None:
+                    self._lines_cache.pop(Path(path), None)
+                    self._summary_cache.pop(Path(path), None)
+                    _log.info("🗑️  Cleaned old todo list: %s", name)
+                else:
+                    _log.warning("⚠️ Failed to clean todo list %s: %s", name, error)
         except Exception as e:
-            print(f"⚠️ Todo list cleanup failed: {e}")
+            _log.warning("⚠️ Todo list cleanup failed: %s", e)
 
     def remove_session_todo(self, session_id: str):
         if session_id in self._session_todo_files:
@@ -488,11 +699,46 @@ class TodoManager:
         self._save_session_todo_map()
 
 
-_todo_managers: Dict[str, TodoManager] = {}
+def _delete_files(paths: List[str]) -> List[Tuple[str, Optional[Exception]]]:
+    """逐个删除文件，返回 (路径, 异常或 None) 列表"""
+    results: List[Tuple[str, Optional[Exception]]] = []
+    for path in paths:
+        try:
+            os.unlink(path)
+            results.append((path, None))
+        except Exception as e:
+            results.append((path, e))
+    return results
+
+
+# 按项目路径缓存的管理器，LRU 淘汰，避免长驻服务中无限增长
+_MAX_MANAGERS = 64
+_todo_managers: "OrderedDict[str, TodoManager]" = OrderedDict()
+_closing_tasks: set = set()
+
+
+def _close_evicted(manager: TodoManager) -> None:
+    """在事件循环中异步关闭被淘汰的管理器，刷写其挂起的修改"""
+    if manager._flusher_task is None:
+        return
+    try:
+        task = asyncio.get_running_loop().create_task(manager.close())
+    except RuntimeError:
+        return
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
 
 
 def get_todo_manager(project_path: Path) -> TodoManager:
     project_key = str(project_path.absolute())
-    if project_key not in _todo_managers:
-        _todo_managers[project_key] = TodoManager(project_path)
-    return _todo_managers[project_key]
+    manager = _todo_managers.get(project_key)
+    if manager is not None:
+        _todo_managers.move_to_end(project_key)
+        return manager
+
+    manager = TodoManager(project_path)
+    _todo_managers[project_key] = manager
+    while len(_todo_managers) > _MAX_MANAGERS:
+        _, victim = _todo_managers.popitem(last=False)
+        _close_evicted(victim)
+    return manager
@@ -11,8 +11,9 @@ from __future__ import annotations
 """
 
 import sys
+from copy import deepcopy
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Mapping
 
 if __package__ in (None, ""):
     sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -21,34 +22,7 @@ else:
     from .tool_registry import ToolSchema
 
 
-_TYPE_MAP_JSON_SCHEMA = {
-    str: "string",
-    int: "integer",
-    float: "number",
-    bool: "boolean",
-    list: "array",
-    dict: "object",
-}
-
-
-def _build_json_schema_properties(
-    schema: ToolSchema,
-) -> tuple[dict, list]:
-    """从 ToolSchema 构建 JSON Schema 的 properties 和 required 列表"""
-    properties = {}
-    required = []
-    for param in schema.parameters:
-        json_type = _TYPE_MAP_JSON_SCHEMA.get(param.type, "string")
-        prop: dict = {"type": json_type, "description": param.description}
-        if param.default is not None:
-            prop["default"] = param.default
-        properties[param.name] = prop
-        if param.required:
-            required.append(param.name)
-    return properties, required
-
-
-def to_openai_tools(schemas: Dict[str, ToolSchema]) -> list:
+def to_openai_tools(schemas: Mapping[str, ToolSchema]) -> list:
     """
     将 ToolSchema 字典转换为 OpenAI native tools 格式
 
@@ -58,25 +32,22 @@ def to_openai_tools(schemas: Dict[str, ToolSchema]) -> list:
     Returns:
         [{"type": "function", "function": {"name": "...", "description": "...", "parameters": {...}}}, ...]
     """
-    tools = []
-    for name, schema in schemas.items():
-        properties, required = _build_json_schema_properties(schema)
-        tools.append({
+    return [
+        {
             "type": "function",
             "function": {
                 "name": name,
                 "description": schema.description,
-                "parameters": {
-                    "type": "object",
-                    "properties": properties,
-                    "required": required,
-                },
+                # json_schema 是缓存在 schema 上的共享字典，深拷贝后再交给 SDK，
+                # 下游修改请求体不会影响之后的请求（工具列表每个调用方只构建一次）
+                "parameters": deepcopy(schema.json_schema),
             },
-        })
-    return tools
+        }
+        for name, schema in schemas.items()
+    ]
 
 
-def to_anthropic_tools(schemas: Dict[str, ToolSchema]) -> list:
+def to_anthropic_tools(schemas: Mapping[str, ToolSchema]) -> list:
     """
     将 ToolSchema 字典转换为 Anthropic native tools 格式
 
@@ -86,16 +57,12 @@ def to_anthropic_tools(schemas: Dict[str, ToolSchema]) -> list:
     Returns:
         [{"name": "...", "description": "...", "input_schema": {"type": "object", ...}}, ...]
     """
-    tools = []
-    for name, schema in schemas.items():
-        properties, required = _build_json_schema_properties(schema)
-        tools.append({
+    return [
+        {
             "name": name,
             "description": schema.description,
-            "input_schema": {
-                "type": "object",
-                "properties": properties,
-                "required": required,
-            },
-        })
-    return tools
+            # 同 to_openai_tools：不把共享的缓存字典直接交给 SDK
+            "input_schema": deepcopy(schema.json_schema),
+        }
+        for name, schema in schemas.items()
+    ]
@@ -8,14 +8,42 @@
 提供工具schema定义、参数验证和文档生成功能
 """
 
+from __future__ import annotations
+
+import logging
+import sys
+from bisect import insort
 from dataclasses import dataclass, field
-from typing import Dict, Any, List, Optional, Callable, Tuple, Set
+from functools import cached_property
+from typing import Dict, Any, List, Mapping, Optional, Callable, Sequence, Tuple, Set
 from difflib import get_close_matches
 
+_log = logging.getLogger(__name__)
 
-@dataclass
+# 可选：rapidfuzz 提供 C 实现的编辑距离，未安装时回退到 difflib
+try:
+    from rapidfuzz import fuzz as _fuzz, process as _fuzz_process  # type: ignore[import-not-found]
+except ImportError:
+    _fuzz = None  # type: ignore[assignment]
+    _fuzz_process = None  # type: ignore[assignment]
+
+# 校验通过时共享的返回值，避免每次分配新元组
+_OK: Tuple[bool, Optional[str]] = (True, None)
+
+# Python 类型 -> JSON Schema 类型，未列出的类型按 string 处理
+_JSON_SCHEMA_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+}
+
+
+@dataclass(frozen=True, slots=True)
 class ToolParameter:
-    """工具参数定义"""
+    """工具参数定义（不可变，schema 中数量最多的对象，用 slots 省掉每个实例的 __dict__）"""
 
     name: str
     type: type
@@ -23,44 +51,74 @@ class ToolParameter:
     default: Any = None
     description: str = ""
     example: Any = None
-    aliases: List[str] = field(default_factory=list)  # 参数别名
+    aliases: Sequence[str] = ()  # 参数别名（列表传入时转成元组）
+
+    def __post_init__(self):
+        # 兼容以列表传入的别名
+        if not isinstance(self.aliases, tuple):
+            object.__setattr__(self, "aliases", tuple(self.aliases))
 
     def validate(self, value: Any) -> Tuple[bool, Optional[str]]:
         """验证参数值"""
-        # 检查类型
-        if value is not None and not isinstance(value, self.type):
-            return (
-                False,
-                f"Parameter '{self.name}' expected type {self.type.__name__}, got {type(value).__name__}",
-            )
-        return True, None
+        # 检查类型：精确类型命中是最常见情况，先走 is 比较
+        if value is None or type(value) is self.type or isinstance(value, self.type):
+            return _OK
+        return (
+            False,
+            f"Parameter '{self.name}' expected type {self.type.__name__}, got {type(value).__name__}",
+        )
 
 
-@dataclass
+# 不用 slots：下面的 cached_property 需要实例 __dict__
+@dataclass(frozen=True)
 class ToolSchema:
-    """工具schema定义"""
+    """工具schema定义（不可变）"""
 
     name: str
     description: str
-    parameters: List[ToolParameter] = field(default_factory=list)
-    examples: List[Dict[str, Any]] = field(default_factory=list)
+    parameters: Sequence[ToolParameter] = ()
+    examples: Sequence[Mapping[str, Any]] = ()
     returns: str = ""
 
+    def __post_init__(self):
+        # 兼容以列表传入的参数和示例，统一存成元组
+        if not isinstance(self.parameters, tuple):
+            object.__setattr__(self, "parameters", tuple(self.parameters))
+        if not isinstance(self.examples, tuple):
+            object.__setattr__(self, "examples", tuple(self.examples))
+
+    # 注册后 schema 不再变化，参数索引首次使用时构建一次
+    @cached_property
+    def _compiled(self) -> _CompiledParams:
+        return _compile_params(self.parameters, self.name)
+
+    @cached_property
+    def json_schema(self) -> Dict[str, Any]:
+        """参数的 JSON Schema（object 类型），首次访问时生成，之后共享同一个字典，调用方不要修改"""
+        properties = {}
+        required = []
+        for param in self.parameters:
+            prop: Dict[str, Any] = {
+                "type": _JSON_SCHEMA_TYPES.get(param.type, "string"),
+                "description": param.description,
+            }
+            if param.default is not None:
+                prop["default"] = param.default
+            properties[param.name] = prop
+            if param.required:
+                required.append(param.name)
+        return {"type": "object", "properties": properties, "required": required}
+
     def validate(self, input_params: Dict) -> Tuple[bool, Optional[str]]:
         """验证输入参数（支持参数别名和自动映射）"""
         if input_params is None:
             input_params = {}
 
-        # 创建参数别名映射
+        compiled = self._compiled
         normalized_params = {}
-        param_map = {}  # 原始参数名 -> 标准参数名
+        param_map = compiled.alias_to_canon  # 原始参数名 -> 标准参数名
         unknown_params = []  # 记录未知参数
 
-        for param in self.parameters:
-            param_map[param.name] = param.name
-            for alias in param.aliases:
-                param_map[alias] = param.name
-
         # 规范化输入参数（支持别名）
         for input_key, input_value in input_params.items():
             if input_key in param_map:
@@ -72,17 +130,15 @@ class ToolSchema:
                 normalized_params[input_key] = input_value
 
         # 检查必需参数
-        missing_params = []
-        for param in self.parameters:
-            if param.required and param.name not in normalized_params:
-                if param.default is None:
-                    missing_params.append(param.name)
+        missing_params = [
+            p.name for p in compiled.required if p.name not in normalized_params
+        ]
 
         if missing_params:
             error_msg = f"❌ Missing required parameters: {', '.join(missing_params)}\n\n"
             error_msg += "📋 Parameter details:\n"
             for param_name in missing_params:
-                param = next(p for p in self.parameters if p.name == param_name)
+                param = compiled.by_name[param_name]
                 aliases_str = (
                     f" (aliases: {', '.join(param.aliases)})" if param.aliases else ""
                 )
@@ -94,18 +150,27 @@ class ToolSchema:
 
         # 检查参数类型
         type_errors = []
+        types = compiled.types
         for param_name, param_value in normalized_params.items():
-            # 查找参数定义
-            param_def = next((p for p in self.parameters if p.name == param_name), None)
-            if param_def:
-                valid, error = param_def.validate(param_value)
-                if not valid:
-                    type_errors.append(error)
+            expected = types.get(param_name)
+            # 未知参数、None 和类型命中都直接跳过，只在出错时才回到参数对象生成错误信息
+            if (
+                expected is None
+                or param_value is None
+                or type(param_value) is expected
+                or isinstance(param_value, expected)
+            ):
+                continue
+            type_errors.append(compiled.by_name[param_name].validate(param_value)[1])
 
         if type_errors:
             return False, "\n".join([e for e in type_errors if e])
 
-        return True, None
+        return _OK
+
+    def resolve_alias(self, param_name: str) -> str:
+        """把参数别名解析为标准参数名，未知参数原样返回"""
+        return self._compiled.alias_to_canon.get(param_name, param_name)
 
     def normalize_params(self, input_params: Dict) -> Dict:
         """规范化参数（将别名转换为标准名称）"""
@@ -113,12 +178,7 @@ class ToolSchema:
             return {}
 
         normalized = {}
-        param_map = {}
-
-        for param in self.parameters:
-            param_map[param.name] = param.name
-            for alias in param.aliases:
-                param_map[alias] = param.name
+        param_map = self._compiled.alias_to_canon
 
         for input_key, input_value in input_params.items():
             if input_key in param_map:
@@ -168,6 +228,46 @@ class ToolSchema:
         return doc
 
 
+@dataclass(frozen=True)
+class _CompiledParams:
+    """ToolSchema 参数的预编译视图：按列存放，校验时只做字典查找"""
+
+    names: Tuple[str, ...]
+    alias_to_canon: Dict[str, str]  # 参数名/别名 -> 标准参数名
+    by_name: Dict[str, ToolParameter]
+    types: Dict[str, type]
+    required: Tuple[ToolParameter, ...]  # 必需且没有默认值的参数
+
+
+def _compile_params(
+    params: Sequence[ToolParameter], tool_name: str = ""
+) -> _CompiledParams:
+    """把参数列表编译成 _CompiledParams（同名参数以第一个为准）
+
+    真实参数名优先于别名；别名与其他参数名或别名冲突时保留先声明的映射并给出警告。
+    """
+    by_name: Dict[str, ToolParameter] = {}
+    for param in params:
+        by_name.setdefault(sys.intern(param.name), param)
+    alias_to_canon: Dict[str, str] = {name: name for name in by_name}
+    for param in params:
+        for alias in param.aliases:
+            alias = sys.intern(alias)
+            canon = alias_to_canon.setdefault(alias, param.name)
+            if canon != param.name:
+                _log.warning(
+                    "⚠️ Tool '%s': alias '%s' of '%s' conflicts with '%s', ignored",
+                    tool_name, alias, param.name, canon,
+                )
+    return _CompiledParams(
+        names=tuple(by_name),
+        alias_to_canon=alias_to_canon,
+        by_name=by_name,
+        types={name: param.type for name, param in by_name.items()},
+        required=tuple(p for p in params if p.required and p.default is None),
+    )
+
+
 @dataclass
 class ValidationResult:
     """验证结果"""
@@ -184,9 +284,13 @@ class ToolRegistry:
     def __init__(self):
         self.tools: Dict[str, Callable] = {}
         self.schemas: Dict[str, ToolSchema] = {}
+        # 已排序的工具名索引，供相似名称建议使用
+        self._name_index: List[str] = []
 
     def register(self, tool_func: Callable, schema: ToolSchema):
         """注册工具及其schema"""
+        if schema.name not in self.schemas:
+            insort(self._name_index, schema.name)
         self.tools[schema.name] = tool_func
         self.schemas[schema.name] = schema
 
@@ -194,6 +298,13 @@ class ToolRegistry:
         """Get 工具schema"""
         return self.schemas.get(tool_name)
 
+    def resolve_alias(self, tool_name: str, param_name: str) -> str:
+        """把参数别名解析为标准参数名，未知工具或参数原样返回"""
+        schema = self.schemas.get(tool_name)
+        if schema is None:
+            return param_name
+        return schema.resolve_alias(param_name)
+
     def get_tool(self, tool_name: str) -> Optional[Callable]:
         """Get 工具函数"""
         return self.tools.get(tool_name)
@@ -232,9 +343,18 @@ class ToolRegistry:
         self, tool_name: str, max_suggestions: int = 3
     ) -> List[str]:
         """建议相似的工具名称"""
-        all_tools = self.list_tools()
-        matches = get_close_matches(tool_name, all_tools, n=max_suggestions, cutoff=0.6)
-        return matches
+        if _fuzz_process is not None:
+            matches = _fuzz_process.extract(
+                tool_name,
+                self._name_index,
+                scorer=_fuzz.ratio,
+                limit=max_suggestions,
+                score_cutoff=60,
+            )
+            return [name for name, _, _ in matches]
+        return get_close_matches(
+            tool_name, self._name_index, n=max_suggestions, cutoff=0.6
+        )
 
     def format_tool_not_found_error(self, tool_name: str) -> str:
         """格式化工具不存在的错误消息"""